@@ -7,7 +7,7 @@ rate limiting, CORS configuration, and route registration.
 
 from fastapi import FastAPI, Request, HTTPException
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import JSONResponse, HTMLResponse
+from fastapi.responses import JSONResponse, HTMLResponse, ORJSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 from pathlib import Path
 from starlette.middleware.sessions import SessionMiddleware
@@ -16,17 +16,22 @@ from slowapi.util import get_remote_address
 from slowapi.errors import RateLimitExceeded
 import logging
 import os
+import queue
+from logging.handlers import QueueHandler, QueueListener
 
 from server.api import router as api_router
 from server.auth_api import router as auth_router
 from server.database import init_db
 from server.config import settings
-from server.thread_pool import shutdown_thread_pool, run_blocking_in_executor
+from server.thread_pool import configure_thread_pools, shutdown_thread_pool
 from server.scheduler import start_scheduler, shutdown_scheduler
-from server.database import SessionLocal
+from server.database import SessionLocal, async_engine, engine
 from server.utils.task_cleanup import cleanup_pending_tasks
 from server.models import Metier_ROME
 from server.routers.jobs_router import load_code_metier
+from server.routers.metiers_router import warm_metiers_list
+from server.methods.FT_job_search import close_http_client, get_http_client
+from server.utils.openai_client import close_openai_clients
 
 # ============================================================================
 # Logging Configuration
@@ -46,19 +51,26 @@ formatter = logging.Formatter("%(asctime)s - %(name)s - %(levelname)s - %(messag
 file_handler.setFormatter(formatter)
 stream_handler.setFormatter(formatter)
 
+# File and console writes happen on a listener thread, callers only enqueue the record
+log_queue: queue.SimpleQueue = queue.SimpleQueue()
+queue_handler = QueueHandler(log_queue)
+# Only merge the args into the message here, the real handlers apply the full format
+queue_handler.setFormatter(logging.Formatter("%(message)s"))
+log_listener = QueueListener(log_queue, file_handler, stream_handler, respect_handler_level=True)
+log_listener.start()
+
 # Configure logging to write to both file and console
 log_level = getattr(logging, settings.log_level.upper(), logging.INFO)
 logging.basicConfig(
     level=log_level,
     format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
-    handlers=[file_handler, stream_handler]
+    handlers=[queue_handler]
 )
 
 # Configure FastAPI/Uvicorn access logging
 access_logger = logging.getLogger("uvicorn.access")
 access_logger.setLevel(log_level)
-access_logger.addHandler(file_handler)
-access_logger.addHandler(stream_handler)
+access_logger.addHandler(queue_handler)
 
 logger = logging.getLogger(__name__)
 logger.info(f"Logging initialized. Log file: {log_file}")
@@ -73,7 +85,8 @@ limiter = Limiter(key_func=get_remote_address, default_limits=["100/minute"])
 # FastAPI Application Initialization
 # ============================================================================
 
-app = FastAPI(docs_url="/apidoc", redoc_url=None)
+# orjson encodes the large nested payloads (offers, analyses) much faster than the stdlib json
+app = FastAPI(docs_url="/apidoc", redoc_url=None, default_response_class=ORJSONResponse)
 
 
 # ============================================================================
@@ -151,8 +164,12 @@ async def startup_event():
     Initializes the database connection and schema, and starts
     the background task scheduler for periodic job offer generation.
     """
+    configure_thread_pools()
     init_db()
 
+    # Open the shared France Travail client now rather than on the first request
+    get_http_client()
+
     try:
         db = SessionLocal()
         try:
@@ -162,7 +179,10 @@ async def startup_event():
 
         if not has_metier:
             logger.info("Metier_ROME est vide; chargement des codes metier au demarrage.")
-            await run_blocking_in_executor(load_code_metier)
+            await load_code_metier()
+
+        # Serialize the referential now so the first /metiers request is served from memory
+        await warm_metiers_list()
     except Exception as e:
         logger.error(f"Erreur lors du chargement initial des codes metier: {e}", exc_info=True)
 
@@ -175,12 +195,13 @@ async def shutdown_event():
     Cleanup on application shutdown.
 
     Gracefully shuts down the thread pool executor, background task scheduler,
-    and marks pending CV evaluations as failed to prevent frontend from hanging.
+    shared HTTP client and database pools, and marks pending CV evaluations as
+    failed to prevent frontend from hanging.
     """
     logger.info("Starting application shutdown...")
 
-    # Shutdown scheduler first to ensure background jobs finish
-    shutdown_scheduler(wait=True)
+    # Shutdown scheduler first to ensure background jobs finish (it waits for running jobs)
+    shutdown_scheduler()
 
     try:
         # Mark any pending CV evaluations as failed
@@ -194,8 +215,15 @@ async def shutdown_event():
     except Exception as e:
         logger.error(f"Error during task cleanup on shutdown: {e}")
 
+    await close_http_client()
+    await close_openai_clients()
+    # Close the pooled database connections of both engines
+    await async_engine.dispose()
+    engine.dispose()
     shutdown_thread_pool()
     logger.info("Application shutdown complete")
+    # Flush the records still waiting in the queue
+    log_listener.stop()
 
 
 # ============================================================================
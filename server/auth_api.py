@@ -5,7 +5,7 @@ from slowapi.util import get_remote_address
 
 from server.database import get_db_session
 from server.config import settings
-from server.models import User
+from server.models import LoginAttempt, User
 from server.utils.dependencies import get_current_user
 from server.methods.passkey_auth import (
     get_passkey_register_options,
@@ -489,9 +489,17 @@ async def get_user_debug_info(request: Request, db: Session = Depends(get_db_ses
             "last_used_at": credential.last_used_at.isoformat() if credential.last_used_at else None
         })
 
-    # Get recent login attempts (last 10)
+    # Get recent login attempts (last 10): let the database pick them rather than
+    # loading and sorting the user's whole login history
+    recent_attempts = (
+        db.query(LoginAttempt)
+        .filter(LoginAttempt.user_id == user.id)
+        .order_by(LoginAttempt.attempted_at.desc())
+        .limit(10)
+        .all()
+    )
     recent_logins = []
-    for attempt in sorted(user.login_attempts, key=lambda x: x.attempted_at, reverse=True)[:10]:
+    for attempt in recent_attempts:
         recent_logins.append({
             "id": attempt.id,
             "success": attempt.success,
@@ -623,20 +631,25 @@ async def update_user_profile(
         if matching_context_changed and user.cv_text:
             from server.scheduler import generate_optimal_offers_for_user
             from server.database import SessionLocal
+            import asyncio
             import logging
             logger = logging.getLogger(__name__)
 
-            def generate_offers_task():
+            user_id = user.id
+
+            async def generate_offers_task():
                 """Background task to regenerate optimal offers after matching context update."""
-                import asyncio
+                # Awaited on the request's event loop: the France Travail client, its token
+                # lock and semaphore are bound to it and cannot be used from asyncio.run in a thread.
+                # The session is sync, so its queries (and close) are run in worker threads
                 db_session = SessionLocal()
                 try:
-                    asyncio.run(generate_optimal_offers_for_user(user.id, db_session, force_refresh=True))
-                    logger.info(f"Optimal offers regeneration triggered for user {user.id} after matching_context update")
+                    await generate_optimal_offers_for_user(user_id, db_session, force_refresh=True)
+                    logger.info(f"Optimal offers regeneration triggered for user {user_id} after matching_context update")
                 except Exception as e:
-                    logger.error(f"Error regenerating optimal offers for user {user.id}: {str(e)}")
+                    logger.error(f"Error regenerating optimal offers for user {user_id}: {str(e)}")
                 finally:
-                    db_session.close()
+                    await asyncio.to_thread(db_session.close)
 
             background_tasks.add_task(generate_offers_task)
             result["optimal_offers_status"] = "regenerating"
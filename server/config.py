@@ -20,6 +20,15 @@ class Settings(BaseSettings):
     debug: bool = False  # Set to True to show detailed error messages
     log_level: str = "INFO"  # Logging level: DEBUG, INFO, WARNING, ERROR, CRITICAL
 
+    # Concurrency
+    thread_pool_size: int = 100  # Worker threads for sync endpoints and asyncio.to_thread
+    blocking_io_pool_size: int = 16  # Bounded pool for run_blocking_in_executor (LLM calls)
+    db_pool_size: int = 5  # Sync engine (scheduler, worker threads, remaining sync endpoints)
+    db_max_overflow: int = 10
+    async_db_pool_size: int = 10  # Async engine used by the request handlers
+    async_db_max_overflow: int = 20
+    scheduler_max_concurrent_users: int = 8  # Users refreshed in parallel by the hourly offers job
+
     # Session Configuration
     session_secret: str = "change-this-secret-in-production"  # IMPORTANT: Set in .env for production
     session_cookie_name: str = "dux_session"
@@ -80,12 +89,19 @@ class Settings(BaseSettings):
     ft_api_url_code_metier: str = ""
     ft_api_url_fiche_competence: str = ""
     ft_api_url_code_competence: str = ""
+    ft_max_concurrent_requests: int = 3  # Upstream rate limit is a few requests per second per application
+    metiers_cache_ttl_seconds: int = 3600  # ROME list only changes when load_code_metier runs
 
     # LLM Configuration
     openai_api_key: str = ""
     openai_model: str = ""
     openai_base_url: str = ""
     streaming_timeout_seconds: int = 300  # 5 minute timeout for streaming responses
+    analysis_cache_ttl_seconds: int = 86400  # Keep job match analyses for 24 hours
+    ft_parameters_cache_ttl_seconds: int = 86400  # Search parameters only change with the CV or context
+    llm_cache_ttl_seconds: int = 86400  # Exact-match cache for LLM calls made with cache=True
+    cv_text_cache_ttl_seconds: int = 86400  # Extracted CV text keyed by the uploaded file's content hash
+    ranking_prefilter_size: int = 20  # Offers sent to the ranking LLM after lexical prefiltering
 
     # VLM Configuration (hosted API) — accepts VLM_API_KEY or VLM_KEY from env
     vlm_api_key: str = Field(
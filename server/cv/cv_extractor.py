@@ -75,6 +75,7 @@ def extract_cv_facts(
             parse_json=True,
             model=model,
             response_format={"type": "json_object"},
+            cache=True,  # Re-evaluating an unchanged CV gives back the same answer
         )
 
         extracted_data = result["data"]
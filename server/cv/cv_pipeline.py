@@ -100,36 +100,12 @@ class CVEvaluationPipeline:
                 file_path_for_vlm = potential_path
                 file_extension = potential_path.suffix.lower()
         
-        # Step 1: Extract structured facts (LLM)
-        logger.info("Step 1: Extracting structured facts from CV...")
-        try:
-            structured_cv = extract_cv_facts(raw_cv_text, model=self.model)
-            logger.info("Step 1 complete: Structured CV extracted")
-        except Exception as e:
-            logger.error(f"Step 1 failed: {e}")
-            errors.append(f"Extraction failed: {e}")
-            raise ValueError(f"Pipeline failed at Step 1 (Extraction): {e}")
-        
-        # Step 2: Validate and compute features
-        logger.info("Step 2: Validating and computing derived features...")
-        try:
-            derived_features = validate_and_compute_features(structured_cv)
-            logger.info(f"Step 2 complete: {derived_features.experience_count} experiences, "
-                       f"{len(derived_features.timeline_gaps)} gaps detected")
-        except Exception as e:
-            logger.error(f"Step 2 failed: {e}")
-            errors.append(f"Validation failed: {e}")
-            raise ValueError(f"Pipeline failed at Step 2 (Validation): {e}")
-        
-        # Step 3: Score the CV (LLM) - Run in parallel with VLM if file available
-        logger.info("Step 3: Scoring CV...")
-        
-        # Run LLM scoring and VLM analysis in parallel if file is available
+        # The VLM only needs the file, not the extracted facts: start it right away so it
+        # overlaps extraction and scoring instead of scoring alone
+        vlm_executor = None
+        vlm_future = None
         if file_path_for_vlm and file_extension in ['.pdf', '.docx', '.doc']:
-            logger.info("Running LLM scoring and VLM visual analysis in parallel...")
-            
-            def run_llm_scoring():
-                return score_cv(structured_cv, derived_features, model=self.model)
+            logger.info("Running VLM visual analysis in parallel with the LLM steps...")
             
             def run_vlm_analysis():
                 try:
@@ -138,28 +114,33 @@ class CVEvaluationPipeline:
                     logger.warning(f"VLM analysis failed (non-critical): {e}")
                     return None
             
-            # Run both in parallel using ThreadPoolExecutor
-            with ThreadPoolExecutor(max_workers=2) as executor:
-                llm_future = executor.submit(run_llm_scoring)
-                vlm_future = executor.submit(run_vlm_analysis)
-                
-                # Wait for both to complete with proper error handling
-                try:
-                    scores = llm_future.result()
-                    logger.info(f"Step 3 complete: Overall score = {scores.overall_score}")
-                except Exception as e:
-                    logger.error(f"Step 3 failed: {e}")
-                    errors.append(f"Scoring failed: {e}")
-                    raise ValueError(f"Pipeline failed at Step 3 (Scoring): {e}")
-                
-                visual_analysis = vlm_future.result()
+            vlm_executor = ThreadPoolExecutor(max_workers=1)
+            vlm_future = vlm_executor.submit(run_vlm_analysis)
+        
+        try:
+            # Step 1: Extract structured facts (LLM)
+            logger.info("Step 1: Extracting structured facts from CV...")
+            try:
+                structured_cv = extract_cv_facts(raw_cv_text, model=self.model)
+                logger.info("Step 1 complete: Structured CV extracted")
+            except Exception as e:
+                logger.error(f"Step 1 failed: {e}")
+                errors.append(f"Extraction failed: {e}")
+                raise ValueError(f"Pipeline failed at Step 1 (Extraction): {e}")
             
-            if visual_analysis:
-                logger.info("VLM visual analysis completed successfully")
-            else:
-                logger.warning("VLM visual analysis was skipped or failed (non-critical)")
-        else:
-            # No file available, run LLM scoring only
+            # Step 2: Validate and compute features
+            logger.info("Step 2: Validating and computing derived features...")
+            try:
+                derived_features = validate_and_compute_features(structured_cv)
+                logger.info(f"Step 2 complete: {derived_features.experience_count} experiences, "
+                           f"{len(derived_features.timeline_gaps)} gaps detected")
+            except Exception as e:
+                logger.error(f"Step 2 failed: {e}")
+                errors.append(f"Validation failed: {e}")
+                raise ValueError(f"Pipeline failed at Step 2 (Validation): {e}")
+            
+            # Step 3: Score the CV (LLM)
+            logger.info("Step 3: Scoring CV...")
             try:
                 scores = score_cv(structured_cv, derived_features, model=self.model)
                 logger.info(f"Step 3 complete: Overall score = {scores.overall_score}")
@@ -167,6 +148,17 @@ class CVEvaluationPipeline:
                 logger.error(f"Step 3 failed: {e}")
                 errors.append(f"Scoring failed: {e}")
                 raise ValueError(f"Pipeline failed at Step 3 (Scoring): {e}")
+            
+            if vlm_future is not None:
+                visual_analysis = vlm_future.result()
+                if visual_analysis:
+                    logger.info("VLM visual analysis completed successfully")
+                else:
+                    logger.warning("VLM visual analysis was skipped or failed (non-critical)")
+        finally:
+            if vlm_executor is not None:
+                # Don't hold a failed evaluation until the VLM answers
+                vlm_executor.shutdown(wait=False)
         
         # Step 4: Assemble final result
         processing_time = time.time() - start_time
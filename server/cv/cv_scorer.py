@@ -74,6 +74,7 @@ def score_cv(
             parse_json=True,
             model=model,
             response_format={"type": "json_object"},
+            cache=True,  # Re-evaluating an unchanged CV gives back the same answer
         )
         
         scores_data = result["data"]
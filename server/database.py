@@ -1,6 +1,9 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, text
+from sqlalchemy.engine import URL, make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker, Session
 from contextlib import contextmanager
+from typing import AsyncIterator
 from server.models import Base
 from server.config import settings
 
@@ -11,19 +14,51 @@ DATABASE_URL = settings.database_url
 engine = create_engine(
     DATABASE_URL,
     pool_pre_ping=True,  # Verify connections before using
-    pool_size=5,
-    max_overflow=10
+    pool_size=settings.db_pool_size,
+    max_overflow=settings.db_max_overflow
 )
 
 # Create session factory
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 
+def _async_database_url(url: str) -> URL:
+    """
+    Map DATABASE_URL onto the asyncio driver of the same backend
+    """
+    async_url = make_url(url)
+    backend = async_url.get_backend_name()
+    if backend == "postgresql":
+        return async_url.set(drivername="postgresql+asyncpg")
+    if backend == "sqlite":
+        return async_url.set(drivername="sqlite+aiosqlite")
+    return async_url
+
+
+# Async engine for request handlers that await their queries on the event loop
+async_engine = create_async_engine(
+    _async_database_url(DATABASE_URL),
+    pool_pre_ping=True,
+    pool_size=settings.async_db_pool_size,
+    max_overflow=settings.async_db_max_overflow
+)
+
+AsyncSessionLocal = async_sessionmaker(bind=async_engine, autoflush=False, expire_on_commit=False)
+
+
 def init_db():
     """
     Initialize the database by creating all tables
     """
+    if engine.dialect.name == "postgresql":
+        # The trigram indexes on metier_rome need pg_trgm (a trusted extension since PostgreSQL 13)
+        with engine.begin() as conn:
+            conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
     Base.metadata.create_all(bind=engine)
+    # create_all skips tables that already exist, so indexes added to them later are created here
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(bind=engine, checkfirst=True)
 
 
 @contextmanager
@@ -51,3 +86,11 @@ def get_db_session() -> Session:
         yield db
     finally:
         db.close()
+
+
+async def get_async_db_session() -> AsyncIterator[AsyncSession]:
+    """
+    Dependency for async FastAPI endpoints to get an AsyncSession
+    """
+    async with AsyncSessionLocal() as db:
+        yield db
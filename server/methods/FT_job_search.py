@@ -5,16 +5,39 @@ Provides methods for interacting with the France Travail API to fetch
 job offers using OAuth2 authentication and search parameters.
 """
 
+import asyncio
 import logging
+import random
 import re
+import threading
+import time
 import unicodedata
+import httpx
+import orjson
 import requests
-from typing import Dict, Any, List
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from typing import AsyncIterator, Dict, Any, List, Optional, Tuple
 
 from server.config import settings
 
 logger = logging.getLogger(__name__)
 
+# France Travail caps each search request at 150 offers
+FT_PAGE_SIZE = 150
+
+# Cached tokens are refreshed this many seconds before they actually expire
+TOKEN_EXPIRY_MARGIN = 30
+
+# Shared async client so France Travail calls reuse pooled keep-alive connections
+_http_client: Optional[httpx.AsyncClient] = None
+
+# Shared sync session for the blocking get_offer_by_id (worker threads), pooling keep-alive connections
+_requests_session: Optional[requests.Session] = None
+
+# Caps in-flight search requests across the whole process to stay under the API rate limit
+_search_semaphore = asyncio.Semaphore(settings.ft_max_concurrent_requests)
+
 # Valid parameter values for France Travail API
 VALID_PARAMETERS = {
     "typeContrat": {"CDI", "CDD", "MIS", "SAI", "CCE", "FRA", "LIB", "REP", "TTI", "DDI", "DIN", "DDT"},
@@ -203,49 +226,223 @@ def _validate_and_clean_parameters(parameters: Dict[str, Any]) -> Dict[str, Any]
     return cleaned
 
 
-def get_ft_oauth_token(client_id: str, client_secret: str, auth_url: str) -> str:
+def offres_scope(client_id: str) -> str:
+    """OAuth scope required by the job offers search API."""
+    return f"api_offresdemploiv2 o2dsoffre application_{client_id}"
+
+
+def get_http_client() -> httpx.AsyncClient:
     """
-    Get OAuth2 token from France Travail authentication service.
+    Return the shared async HTTP client used for France Travail calls.
 
-    Args:
-        client_id: OAuth client ID
-        client_secret: OAuth client secret
-        auth_url: Authentication endpoint URL
+    The client is created on first use and kept for the lifetime of the process
+    so that connections (and their TLS sessions) are reused across requests.
+    """
+    global _http_client
 
-    Returns:
-        OAuth2 access token
+    if _http_client is None or _http_client.is_closed:
+        _http_client = httpx.AsyncClient(
+            http2=True,
+            # Fail fast on unreachable hosts rather than holding the request for the full read timeout
+            timeout=httpx.Timeout(30.0, connect=5.0),
+            limits=httpx.Limits(max_keepalive_connections=32),
+        )
+    return _http_client
 
-    Raises:
-        Exception: If authentication fails
+
+def get_requests_session() -> requests.Session:
     """
-    auth_data = {
-        "grant_type": "client_credentials",
-        "client_id": client_id,
-        "client_secret": client_secret,
-        "scope": f"api_offresdemploiv2 o2dsoffre application_{client_id}",
-    }
-    params = {"realm": "/partenaire"}
+    Return the shared requests session used by the synchronous get_offer_by_id.
+
+    Connection errors and 502/503/504 responses are retried by the transport adapter;
+    429 responses are left to the caller.
+    """
+    global _requests_session
+
+    if _requests_session is None:
+        session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=10,
+            pool_maxsize=50,
+            max_retries=Retry(total=3, backoff_factor=0.3, status_forcelist=[502, 503, 504], raise_on_status=False),
+        )
+        session.mount("https://", adapter)
+        _requests_session = session
+    return _requests_session
+
+
+async def close_http_client() -> None:
+    """Close the shared HTTP clients. Should be called during application shutdown."""
+    global _http_client, _requests_session
+
+    if _http_client is not None:
+        await _http_client.aclose()
+        _http_client = None
+    if _requests_session is not None:
+        _requests_session.close()
+        _requests_session = None
+
+
+def _build_query_params(parameters: Dict[str, Any]) -> Dict[str, str]:
+    """Serialize cleaned search parameters to the query string expected by the API."""
+    query_params = {}
+    for key, value in parameters.items():
+        if value is not None and value != "":
+            # Convert booleans to lowercase strings as expected by API
+            if isinstance(value, bool):
+                query_params[key] = str(value).lower()
+            else:
+                query_params[key] = str(value)
+    return query_params
 
-    resp = requests.post(auth_url, data=auth_data, params=params)
-    resp.raise_for_status()
-    return resp.json()["access_token"]
 
+def retry_delay(resp: httpx.Response, attempt: int, base_delay: float = 1.0) -> float:
+    """Delay before retrying a rate-limited request: Retry-After when given, exponential backoff otherwise."""
+    retry_after = resp.headers.get("Retry-After", "")
+    if retry_after.isdigit():
+        return float(retry_after)
+    return base_delay * (2 ** attempt) + random.uniform(0, base_delay)
 
-def search_france_travail(
+
+def _parse_content_range_total(content_range: Optional[str]) -> Optional[int]:
+    """Extract the total result count from a Content-Range header (e.g. "offres 0-149/1234")."""
+    if not content_range or "/" not in content_range:
+        return None
+    try:
+        return int(content_range.rsplit("/", 1)[1])
+    except ValueError:
+        return None
+
+
+class TokenCache:
+    """
+    In-process cache of France Travail access tokens, keyed by OAuth scope.
+
+    Tokens are kept until TOKEN_EXPIRY_MARGIN seconds before their `expires_in`
+    so that the common path does not pay an extra round-trip to the auth server.
+    The async (event loop) and sync (worker threads) accessors share the same tokens.
+    """
+
+    _tokens: Dict[str, Tuple[str, float]] = {}
+    _lock = asyncio.Lock()
+    _sync_lock = threading.Lock()
+
+    @classmethod
+    def _cached(cls, scope: str) -> Optional[str]:
+        cached = cls._tokens.get(scope)
+        if cached and time.monotonic() < cached[1]:
+            return cached[0]
+        return None
+
+    @staticmethod
+    def _auth_request(scope: str) -> Dict[str, Any]:
+        return {
+            "url": settings.ft_auth_url,
+            "data": {
+                "grant_type": "client_credentials",
+                "client_id": settings.ft_client_id,
+                "client_secret": settings.ft_client_secret,
+                "scope": scope,
+            },
+            "params": {"realm": "/partenaire"},
+        }
+
+    @classmethod
+    def _store(cls, scope: str, payload: Dict[str, Any]) -> str:
+        token = payload["access_token"]
+        expires_in = float(payload.get("expires_in", 0))
+        cls._tokens[scope] = (token, time.monotonic() + expires_in - TOKEN_EXPIRY_MARGIN)
+        return token
+
+    @classmethod
+    async def get(cls, scope: str) -> str:
+        """
+        Return a valid access token for the given scope, requesting a new one if needed.
+
+        Args:
+            scope: OAuth2 scope string
+
+        Returns:
+            OAuth2 access token
+
+        Raises:
+            httpx.HTTPStatusError: If authentication fails
+        """
+        token = cls._cached(scope)
+        if token:
+            return token
+
+        async with cls._lock:
+            # Another request may have fetched the token while we were waiting
+            token = cls._cached(scope)
+            if token:
+                return token
+
+            resp = await get_http_client().post(**cls._auth_request(scope))
+            resp.raise_for_status()
+            return cls._store(scope, resp.json())
+
+    @classmethod
+    def get_sync(cls, scope: str) -> str:
+        """
+        Blocking counterpart of get() for code running in worker threads.
+
+        Args:
+            scope: OAuth2 scope string
+
+        Returns:
+            OAuth2 access token
+
+        Raises:
+            requests.HTTPError: If authentication fails
+        """
+        token = cls._cached(scope)
+        if token:
+            return token
+
+        with cls._sync_lock:
+            token = cls._cached(scope)
+            if token:
+                return token
+
+            resp = get_requests_session().post(**cls._auth_request(scope), timeout=30)
+            resp.raise_for_status()
+            return cls._store(scope, resp.json())
+
+    @classmethod
+    def invalidate(cls, scope: str, token: Optional[str] = None) -> None:
+        """
+        Drop the cached token for a scope (e.g. after a 401).
+
+        If `token` is given, the entry is only dropped when it still holds that
+        token, so concurrent callers do not discard a freshly refreshed one.
+        """
+        cached = cls._tokens.get(scope)
+        if cached and (token is None or cached[0] == token):
+            cls._tokens.pop(scope, None)
+
+
+async def iter_france_travail_pages_async(
     parameters: Dict[str, Any],
     nb_offres: int = 50,
     max_retries: int = 3
-) -> List[Dict[str, Any]]:
+) -> AsyncIterator[List[Dict[str, Any]]]:
     """
-    Search for job offers from France Travail API with given parameters.
+    Yield pages of job offers from France Travail API, in order, as they arrive.
+
+    The first page is fetched on its own to learn the total result count from the
+    Content-Range header; the remaining pages are then requested concurrently.
+    At most FT_MAX_CONCURRENT_REQUESTS page requests are in flight at once, process-wide.
+    Tokens come from TokenCache; a 401 on any page refreshes the token once for all pages,
+    and a 429 is retried after the Retry-After delay.
 
     Args:
         parameters: Dictionary of search parameters (e.g., codeROME, region, motsCles)
         nb_offres: Maximum number of offers to retrieve (default: 50)
-        max_retries: Number of retries on token expiry (default: 3)
+        max_retries: Number of retries on token expiry or rate limiting (default: 3)
 
-    Returns:
-        List of job offer dictionaries
+    Yields:
+        Lists of job offer dictionaries, one per API page
 
     Raises:
         ValueError: If search fails or API is unreachable
@@ -259,140 +456,88 @@ def search_france_travail(
         if not all([CLIENT_ID, CLIENT_SECRET, AUTH_URL, API_URL]):
             raise ValueError("France Travail API credentials not configured in environment")
 
-        # Validate and clean parameters first
-        parameters = _validate_and_clean_parameters(parameters)
-        logger.debug(f"France Travail Search - Cleaned parameters: {parameters}")
-
-        # Get OAuth2 token
-        token = get_ft_oauth_token(CLIENT_ID, CLIENT_SECRET, AUTH_URL)
-
-        # Build base headers (only auth and content-type)
-        headers = {
-            "Authorization": f"Bearer {token}",
-            "Accept": "application/json",
-            "Content-Type": "application/json"
-        }
-
-        # Build query parameters (exclude None and empty string values)
-        query_params = {}
-        for key, value in parameters.items():
-            if value is not None and value != "":
-                # Convert booleans to lowercase strings as expected by API
-                if isinstance(value, bool):
-                    query_params[key] = str(value).lower()
-                else:
-                    query_params[key] = str(value)
-
-        # Log the full request before sending
-        logger.debug(f"France Travail API Request - URL: {API_URL}")
-        logger.debug(f"France Travail API Request - Query params: {query_params}")
-
-        # Fetch offers from API (handle pagination)
-        offers = []
-        retry_count = 0
-
-        for i in range(0, nb_offres, 150):
-            # Calculate end index, capped at nb_offres - 1 (API uses 0-based indexing)
-            end_index = min(i + 149, nb_offres - 1)
+        if nb_offres <= 0:
+            return
 
-            # Update range for this batch
-            query_params["range"] = f"{i}-{end_index}"
-
-            try:
-                resp = requests.get(API_URL, headers=headers, params=query_params, timeout=30)
-                resp.raise_for_status()
-
-                # Handle 204 No Content (no results found)
-                if resp.status_code == 204:
-                    logger.info(
-                        "France Travail: No results found (204 No Content) - Search params: %s",
-                        query_params
-                    )
-                    break
-
-                # Parse JSON response with error handling
-                try:
-                    data = resp.json()
-                except requests.exceptions.JSONDecodeError as json_err:
-                    logger.error(
-                        "France Travail returned non-JSON response: status=%s headers=%s body=%s",
-                        resp.status_code,
-                        dict(resp.headers),
-                        resp.text[:500]
+        parameters = _validate_and_clean_parameters(parameters)
+        logger.debug("France Travail Search - Cleaned parameters: %s", parameters)
+        query_params = _build_query_params(parameters)
+
+        client = get_http_client()
+        scope = offres_scope(CLIENT_ID)
+        # Invariant part of every page request; only the token and the range change
+        base_headers = {"Accept": "application/json", "Content-Type": "application/json"}
+
+        async def fetch_page(start: int, end: int) -> httpx.Response:
+            page_params = query_params | {"range": f"{start}-{end}"}
+            for attempt in range(max_retries + 1):
+                sent_token = await TokenCache.get(scope)
+                async with _search_semaphore:
+                    resp = await client.get(
+                        API_URL,
+                        headers=base_headers | {"Authorization": f"Bearer {sent_token}"},
+                        params=page_params,
                     )
-                    raise ValueError(f"France Travail API returned invalid JSON: {json_err}")
-
-                batch_results = data.get("resultats", [])
-                logger.debug(f"France Travail API Response - Batch {i//150 + 1}: Received {len(batch_results)} results")
-                logger.debug(f"First result sample: {batch_results[0] if batch_results else 'No results'}")
-                offers.extend(batch_results)
-
-                # If we got fewer results than requested, we've reached the end
-                if len(data.get("resultats", [])) < 150:
-                    break
-
-            except requests.exceptions.HTTPError as e:
-                if e.response.status_code == 401 and retry_count < max_retries:
-                    # Token expired, refresh and retry
-                    logger.warning(f"Token expired, refreshing (attempt {retry_count + 1}/{max_retries})")
-                    token = get_ft_oauth_token(CLIENT_ID, CLIENT_SECRET, AUTH_URL)
-                    headers["Authorization"] = f"Bearer {token}"
-                    retry_count += 1
-
-                    # Retry the request with updated token
-                    resp = requests.get(API_URL, headers=headers, params=query_params, timeout=30)
-                    resp.raise_for_status()
-
-                    # Handle 204 No Content on retry
-                    if resp.status_code == 204:
-                        logger.info(
-                            "France Travail: No results found on retry (204 No Content) - Search params: %s",
-                            query_params
-                        )
-                        break
-
-                    try:
-                        data = resp.json()
-                    except requests.exceptions.JSONDecodeError as json_err:
-                        logger.error(
-                            "France Travail returned non-JSON response on retry: status=%s body=%s",
-                            resp.status_code,
-                            resp.text[:500]
-                        )
-                        raise ValueError(f"France Travail API returned invalid JSON on retry: {json_err}")
-
-                    batch_results = data.get("resultats", [])
-                    logger.debug(
-                        f"France Travail API Response (retry) - Batch {i//150 + 1}: Received {len(batch_results)} results")
-                    offers.extend(batch_results)
-                else:
-                    # Log detailed France Travail error payload if available
-                    status = getattr(e.response, "status_code", "Unknown")
-                    err_text = None
-                    err_json = None
-                    try:
-                        err_json = e.response.json()
-                    except Exception:
-                        try:
-                            err_text = e.response.text
-                        except Exception:
-                            err_text = str(e)
-
-                    if isinstance(err_json, dict):
-                        logger.error(
-                            "France Travail API error: status=%s codeErreur=%s message=%s",
-                            status,
-                            err_json.get("codeErreur"),
-                            err_json.get("message")
-                        )
-                    else:
-                        logger.error("France Travail API error: status=%s body=%s", status, err_text)
-                    raise
-
-        logger.info(f"France Travail: Successfully retrieved {len(offers)} total offers from parameters: {parameters}")
-        return offers
+                if resp.status_code == 401 and attempt < max_retries:
+                    logger.warning(f"Token expired, refreshing (attempt {attempt + 1}/{max_retries})")
+                    # Only drops the entry if no other page has refreshed it already
+                    TokenCache.invalidate(scope, sent_token)
+                    continue
+                if resp.status_code == 429 and attempt < max_retries:
+                    delay = retry_delay(resp, attempt)
+                    logger.warning(f"Rate limited, retrying in {delay:.2f}s (attempt {attempt + 1}/{max_retries})")
+                    await asyncio.sleep(delay)
+                    continue
+                if resp.is_error:
+                    logger.error("France Travail API error: status=%s body=%s", resp.status_code, resp.text[:500])
+                resp.raise_for_status()
+                return resp
 
-    except requests.exceptions.RequestException as e:
+        def page_results(resp: httpx.Response) -> List[Dict[str, Any]]:
+            # 204 No Content means no (more) results
+            if resp.status_code == 204:
+                return []
+            try:
+                return orjson.loads(resp.content).get("resultats", [])
+            except ValueError as json_err:
+                logger.error(
+                    "France Travail returned non-JSON response: status=%s body=%s",
+                    resp.status_code,
+                    resp.text[:500]
+                )
+                raise ValueError(f"France Travail API returned invalid JSON: {json_err}")
+
+        first = await fetch_page(0, min(FT_PAGE_SIZE, nb_offres) - 1)
+        first_offers = page_results(first)
+        count = len(first_offers)
+
+        total = _parse_content_range_total(first.headers.get("Content-Range"))
+        if total is None and len(first_offers) < FT_PAGE_SIZE:
+            total = len(first_offers)
+        limit = nb_offres if total is None else min(nb_offres, total)
+
+        # Start the remaining requests before handing out the first page
+        tasks = [
+            asyncio.ensure_future(fetch_page(i, min(i + FT_PAGE_SIZE, limit) - 1))
+            for i in range(FT_PAGE_SIZE, limit, FT_PAGE_SIZE)
+        ]
+        try:
+            yield first_offers
+            for task in tasks:
+                page = page_results(await task)
+                count += len(page)
+                yield page
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+                elif not task.cancelled():
+                    # Retrieve the exception of pages we will never read to avoid asyncio warnings
+                    task.exception()
+
+        logger.info(f"France Travail: Successfully retrieved {count} total offers from parameters: {parameters}")
+
+    except httpx.HTTPError as e:
         logger.error(f"France Travail API request error: {str(e)}")
         raise ValueError(f"Failed to communicate with France Travail API: {str(e)}")
     except Exception as e:
@@ -400,6 +545,33 @@ def search_france_travail(
         raise ValueError(f"France Travail job search failed: {str(e)}")
 
 
+async def search_france_travail_async(
+    parameters: Dict[str, Any],
+    nb_offres: int = 50,
+    max_retries: int = 3
+) -> List[Dict[str, Any]]:
+    """
+    Search for job offers from France Travail API without blocking the event loop.
+
+    Collects every page from iter_france_travail_pages_async into a single list.
+
+    Args:
+        parameters: Dictionary of search parameters (e.g., codeROME, region, motsCles)
+        nb_offres: Maximum number of offers to retrieve (default: 50)
+        max_retries: Number of retries on token expiry (default: 3)
+
+    Returns:
+        List of job offer dictionaries
+
+    Raises:
+        ValueError: If search fails or API is unreachable
+    """
+    offers = []
+    async for page in iter_france_travail_pages_async(parameters, nb_offres, max_retries):
+        offers.extend(page)
+    return offers
+
+
 def get_offer_by_id(offer_id: str) -> Dict[str, Any]:
     """
     Fetch a specific job offer from France Travail API by ID.
@@ -428,8 +600,9 @@ def get_offer_by_id(offer_id: str) -> Dict[str, Any]:
         if api_base_url.endswith("/search"):
             api_base_url = api_base_url[: -len("/search")]
 
-        # Get OAuth2 token
-        token = get_ft_oauth_token(CLIENT_ID, CLIENT_SECRET, AUTH_URL)
+        # Get OAuth2 token (cached until shortly before expiry)
+        scope = offres_scope(CLIENT_ID)
+        token = TokenCache.get_sync(scope)
         url = f"{api_base_url}/{offer_id}"
         headers = {
             "Authorization": f"Bearer {token}",
@@ -437,7 +610,13 @@ def get_offer_by_id(offer_id: str) -> Dict[str, Any]:
         }
 
         logger.info(f"Fetching offer {offer_id} from France Travail API")
-        response = requests.get(url, headers=headers, timeout=30)
+        response = get_requests_session().get(url, headers=headers, timeout=30)
+
+        if response.status_code == 401:
+            # Cached token revoked before its expiry, fetch a new one once
+            TokenCache.invalidate(scope, token)
+            headers["Authorization"] = f"Bearer {TokenCache.get_sync(scope)}"
+            response = get_requests_session().get(url, headers=headers, timeout=30)
 
         if response.status_code == 204:
             raise ValueError(f"Offer {offer_id} not found (204 No Content)")
@@ -454,7 +633,7 @@ def get_offer_by_id(offer_id: str) -> Dict[str, Any]:
 
         response.raise_for_status()
 
-        offer = response.json()
+        offer = orjson.loads(response.content)
         logger.info(f"Successfully retrieved offer {offer_id}: {offer.get('intitule', 'Unknown')}")
 
         return offer
@@ -1,16 +1,19 @@
 import logging
-import json
 import asyncio
+import copy
+import heapq
+import re
 from typing import Optional, Dict, Any, List
 from pathlib import Path
 from datetime import datetime, timedelta
+from sqlalchemy import insert
 from sqlalchemy.orm import Session
 from server.config import settings
+from server.utils.cache import TTLCache, digest_key
 from server.utils.llm import call_llm_async, call_llm_sync, extract_response_content, parse_json_response
 from openai import OpenAI, APIError
-from server.thread_pool import run_blocking_in_executor
 from server.utils.prompts import load_prompt_template
-from server.methods.FT_job_search import search_france_travail
+from server.methods.FT_job_search import search_france_travail_async
 from server.models import User, OptimalOffer
 
 logger = logging.getLogger(__name__)
@@ -84,36 +87,8 @@ def _extract_response_content(choice: Any) -> str:
     return content
 
 
-def _parse_json_response(content: str, json_array: bool = False) -> Dict[str, Any] | List[Any]:
-    """
-    Parse JSON from LLM response, extracting JSON from surrounding text if needed.
-
-    Args:
-        content: Response content string
-        json_array: Whether to extract JSON array (vs object)
-
-    Returns:
-        Parsed JSON object or array
-
-    Raises:
-        ValueError: If JSON parsing fails
-    """
-    try:
-        if json_array:
-            json_start = content.find('[')
-            json_end = content.rfind(']') + 1
-        else:
-            json_start = content.find('{')
-            json_end = content.rfind('}') + 1
-
-        if json_start >= 0 and json_end > json_start:
-            json_str = content[json_start:json_end]
-            return json.loads(json_str)
-        else:
-            return json.loads(content)
-    except json.JSONDecodeError as e:
-        logger.error(f"Failed to parse JSON response: {content}")
-        raise ValueError(f"Invalid JSON in LLM response: {str(e)}")
+# Single parsing path for LLM JSON output, shared with server.utils.llm
+_parse_json_response = parse_json_response
 
 
 def _build_usage_dict(response: Any) -> Dict[str, int]:
@@ -215,6 +190,21 @@ Only return the JSON object, no additional text."""
     return prompt
 
 
+# Parameters derived from a given CV/context, so the hourly scheduler run does not pay an LLM
+# round-trip per user when nothing changed since the previous run
+# (only used from the event loop, between awaits, so it needs no lock)
+_ft_parameters_cache = TTLCache(ttl=settings.ft_parameters_cache_ttl_seconds)
+
+
+def _ft_parameters_cache_key(
+    cv_text: str,
+    preferences: Optional[str],
+    matching_context: Optional[str]
+) -> str:
+    """Digest of every input of the FT parameters prompt."""
+    return digest_key(cv_text, preferences or "", matching_context or "")
+
+
 async def identify_ft_parameters(
     cv_text: str,
     preferences: Optional[str] = None,
@@ -243,6 +233,12 @@ async def identify_ft_parameters(
     """
     _validate_cv_text(cv_text)
 
+    cache_key = _ft_parameters_cache_key(cv_text, preferences, matching_context)
+    cached = _ft_parameters_cache.get(cache_key)
+    if cached is not None:
+        # Callers may edit the parameters before searching, never hand out the stored object
+        return copy.deepcopy(cached)
+
     try:
         prompt = create_ft_parameters_prompt(cv_text, preferences, matching_context)
         result = await call_llm_async(
@@ -251,7 +247,9 @@ async def identify_ft_parameters(
             temperature=0.5,
             max_tokens=2000,
             parse_json=True,
-            json_array=False
+            json_array=False,
+            # Constrain decoding to a single JSON object, as the CV extractor does
+            response_format={"type": "json_object"},
         )
 
         parameters = result["data"]
@@ -259,12 +257,15 @@ async def identify_ft_parameters(
         if isinstance(parameters, dict) and "motsCles" in parameters:
             parameters.pop("motsCles", None)
 
-        return {
+        response = {
             "success": True,
             "parameters": parameters,
             "model": result["model"],
             "usage": result["usage"]
         }
+        if isinstance(parameters, dict):
+            _ft_parameters_cache.set(cache_key, copy.deepcopy(response))
+        return response
     except Exception as e:
         logger.error(f"Unexpected error in FT parameters identification: {str(e)}")
         raise ValueError(f"FT parameters identification failed: {str(e)}")
@@ -285,15 +286,50 @@ def _format_job_offers_for_analysis(job_offers: List[Dict[str, Any]]) -> str:
     Returns:
         Formatted job offers as text
     """
-    offers_text = ""
+    # Collect the pieces and join once: repeated += on the growing text copies it for every offer
+    parts = []
     for i, offer in enumerate(job_offers, 1):
-        offers_text += f"\n{i}. {offer.get('intitule', 'Unknown Position')}  - {offer.get(
-            'entreprise_nom', 'Unknown Company')} \n"
-        offers_text += f"   Location: {offer.get('lieuTravail_libelle', 'N/A')}\n"
-        offers_text += f"   Contract: {offer.get('typeContratLibelle', 'N/A')}\n"
-        offers_text += f"   Description: {offer.get('description', 'N/A')[:200]}...\n"
-        offers_text += f"   Salary: {offer.get('salaire_libelle', 'N/A')}\n"
-    return offers_text
+        parts.append(
+            f"\n{i}. {offer.get('intitule', 'Unknown Position')}  - {offer.get('entreprise_nom', 'Unknown Company')} \n"
+            f"   Location: {offer.get('lieuTravail_libelle', 'N/A')}\n"
+            f"   Contract: {offer.get('typeContratLibelle', 'N/A')}\n"
+            f"   Description: {offer.get('description', 'N/A')[:200]}...\n"
+            f"   Salary: {offer.get('salaire_libelle', 'N/A')}\n"
+        )
+    return "".join(parts)
+
+
+_WORD_RE = re.compile(r"\w{3,}")
+
+
+def _prefilter_job_offers(cv_text: str, job_offers: List[Dict[str, Any]], limit: int) -> List[Dict[str, Any]]:
+    """
+    Keep the `limit` offers sharing the most words with the CV, in their original order.
+
+    A cheap lexical pass so the ranking prompt only carries plausible candidates
+    instead of every offer returned by the search.
+
+    Args:
+        cv_text: User's CV text
+        job_offers: List of job offer dictionaries from France Travail API
+        limit: Maximum number of offers to keep
+
+    Returns:
+        The retained offers
+    """
+    if len(job_offers) <= limit:
+        return job_offers
+
+    cv_words = set(_WORD_RE.findall(cv_text.lower()))
+
+    def overlap(index: int) -> int:
+        offer = job_offers[index]
+        text = f"{offer.get('intitule') or ''} {offer.get('description') or ''}".lower()
+        return len(cv_words.intersection(_WORD_RE.findall(text)))
+
+    # nlargest is stable, so ties keep the search API's relevance order
+    kept = heapq.nlargest(limit, range(len(job_offers)), key=overlap)
+    return [job_offers[i] for i in sorted(kept)]
 
 
 def create_job_ranking_prompt(
@@ -425,6 +461,25 @@ async def rank_job_offers(
 # ============================================================================
 
 
+def _load_cached_offers(db: Session, user_id: int) -> List[OptimalOffer]:
+    """Load a user's cached optimal offers in ranking order (blocking, run off the event loop)."""
+    return db.query(OptimalOffer).filter(
+        OptimalOffer.user_id == user_id
+    ).order_by(OptimalOffer.position).all()
+
+
+def _save_optimal_offers(db: Session, user_id: int, offers_with_data: List[Dict[str, Any]]) -> None:
+    """Replace a user's cached optimal offers (blocking, run off the event loop)."""
+    db.query(OptimalOffer).filter(OptimalOffer.user_id == user_id).delete()
+    # Plain rows in one executemany INSERT: nothing reads these back as ORM objects
+    if offers_with_data:
+        db.execute(
+            insert(OptimalOffer),
+            [{"user_id": user_id, **offer_with_data} for offer_with_data in offers_with_data],
+        )
+    db.commit()
+
+
 async def get_optimal_offers_with_cache(
     current_user: User,
     db: Session,
@@ -461,9 +516,8 @@ async def get_optimal_offers_with_cache(
     # Check cache first (unless force_refresh is True)
     if not force_refresh:
         try:
-            cached_offers = db.query(OptimalOffer).filter(
-                OptimalOffer.user_id == current_user.id
-            ).order_by(OptimalOffer.position).all()
+            # The session is sync: its queries run in a worker thread, not on the event loop
+            cached_offers = await asyncio.to_thread(_load_cached_offers, db, current_user.id)
 
             if cached_offers:
                 # Check if cache is fresh
@@ -495,16 +549,13 @@ async def get_optimal_offers_with_cache(
         except Exception as e:
             logger.warning(f"Error checking cache: {str(e)}, proceeding with fresh search")
 
-    # Cache is stale or missing, fetch new offers in thread pool
-    # Run France Travail API call in thread pool to avoid blocking other clients
+    # Cache is stale or missing, fetch new offers
+    # Pages are requested concurrently on the event loop, no worker thread is held,
+    # and the timeout actually cancels the in-flight requests
     # Add timeout to prevent scheduler from hanging
     try:
         offers = await asyncio.wait_for(
-            run_blocking_in_executor(
-                search_france_travail,
-                ft_parameters or {},
-                50
-            ),
+            search_france_travail_async(ft_parameters or {}, 50),
             timeout=300  # 5 minute timeout for API search
         )
     except asyncio.TimeoutError:
@@ -516,6 +567,10 @@ async def get_optimal_offers_with_cache(
     if not offers:
         raise ValueError("No job offers found from France Travail API with the provided parameters")
 
+    # Only the best lexical candidates go into the ranking prompt; positions returned by
+    # the LLM index into this reduced list
+    offers = _prefilter_job_offers(current_user.cv_text or "", offers, settings.ranking_prefilter_size)
+
     # Rank the offers using LLM (also in thread pool)
     # Add timeout for LLM ranking
     try:
@@ -535,9 +590,6 @@ async def get_optimal_offers_with_cache(
         )
         raise ValueError("Timeout ranking job offers - LLM service took too long")
 
-    # Save optimal offers to database (delete old ones first)
-    db.query(OptimalOffer).filter(OptimalOffer.user_id == current_user.id).delete()
-
     ranked_offers = result.get("ranked_offers", [])
     # Map ranked offers to get job IDs from full job data using position (1-indexed)
     offers_with_data = []
@@ -552,17 +604,7 @@ async def get_optimal_offers_with_cache(
             logger.warning(f"Skipping offer with invalid position {position} or missing job_id")
             continue
 
-        db_offer = OptimalOffer(
-            user_id=current_user.id,
-            position=position,
-            job_id=job_id,
-            score=offer.get("score", 0),
-            match_reasons=offer.get("match_reasons", []),
-            concerns=offer.get("concerns", []),
-        )
-        db.add(db_offer)
-
-        # Build simplified OptimalOffer for response
+        # Build simplified OptimalOffer for response (also the row to insert, minus user_id)
         offer_with_data = {
             "job_id": job_id,
             "position": position,
@@ -572,7 +614,8 @@ async def get_optimal_offers_with_cache(
         }
         offers_with_data.append(offer_with_data)
 
-    db.commit()
+    # Save optimal offers to database (delete old ones first), off the event loop
+    await asyncio.to_thread(_save_optimal_offers, db, current_user.id, offers_with_data)
 
     # Add cache status and offers to result
     result["cached"] = False
@@ -37,7 +37,7 @@ class MatchingEngine:
         
         # CAS A : Utilisation directe du texte brut en BDD
         if user.cv_text and len(user.cv_text.strip()) > 10:
-            logger.info(f"MATCHING : Utilisation du cv_text brut pour User ID {user.id}")
+            logger.info("MATCHING : Utilisation du cv_text brut pour User ID %s", user.id)
             
             headline = user.headline or "Candidat"
             summary = "Voir le contenu complet du CV ci-dessous."
@@ -105,6 +105,9 @@ class MatchingEngine:
     def analyser_match(self, user: User, job: Offres_FT, lang: str = "fr") -> dict:
         """
         Exécute l'analyse de matching.
+
+        `job` peut être une ligne Offres_FT ou tout objet exposant intitule, entreprise_nom,
+        description et competences (ex. le payload JobDataForAnalysis).
         """
         try:
             prompt = self._generate_prompt(user, job, lang)
@@ -115,7 +118,9 @@ class MatchingEngine:
                 system_content="Tu es un moteur de matching JSON strict.",
                 temperature=0.2,
                 max_tokens=1000,
-                parse_json=True
+                parse_json=True,
+                # Constrain decoding to a single JSON object: no prose around it, no parse failure
+                response_format={"type": "json_object"}
             )
 
             return result["data"]
@@ -5,23 +5,35 @@ Handles CV file uploads, text extraction from various file formats
 (PDF, DOCX, TXT), with OCR fallback support for scanned PDFs.
 """
 
+import asyncio
+import hashlib
+import threading
 from fastapi import UploadFile, File, HTTPException
 from pathlib import Path
-import shutil
 import os
 import uuid
 import logging
-from typing import Dict, Any, List
+from typing import BinaryIO, Dict, Any, Iterator, List
 
 import PyPDF2
 import pytesseract
 from docx import Document
 from PIL import Image
 
+from server.config import settings
+from server.utils.cache import TTLCache
+
 logger = logging.getLogger(__name__)
 
 UPLOAD_DIR = Path(os.getenv("UPLOAD_DIR", "./uploads"))
 UPLOAD_DIR.mkdir(exist_ok=True, parents=True)
+# Uploads are copied to disk 1 MiB at a time, never held whole in memory
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+
+# Extracted text per (content hash, extension): re-uploading the same CV skips parsing and OCR.
+# Filled from worker threads, hence the lock
+_extracted_text_cache = TTLCache(ttl=settings.cv_text_cache_ttl_seconds, maxsize=256)
+_extracted_text_cache_lock = threading.Lock()
 
 
 # ============================================================================
@@ -45,25 +57,29 @@ def extract_text_from_pdf(file_path: Path) -> str:
     Note:
         OCR fallback requires pytesseract and PyMuPDF to be installed
     """
-    text = ""
+    # Page texts are collected and joined once instead of re-copying the growing string per page
+    parts: List[str] = []
     try:
         with open(file_path, 'rb') as pdf_file:
             pdf_reader = PyPDF2.PdfReader(pdf_file)
             for page in pdf_reader.pages:
-                text += page.extract_text() + "\n"
+                parts.append(page.extract_text())
     except Exception as e:
         logger.warning(f"Error extracting text from PDF: {e}")
-        text = ""
+        parts = []
+    text = "\n".join(parts)
 
     # If no text was extracted, try OCR using PyMuPDF for image conversion
     if not text.strip():
         logger.info("No text found in PDF, attempting OCR...")
+        parts = []
         try:
-            images = convert_pdf_to_images(file_path)
-            for image in images:
-                text += pytesseract.image_to_string(image) + "\n"
+            # One rendered page in memory at a time: a 2x page bitmap is ~10 MB
+            for image in iter_pdf_page_images(file_path):
+                parts.append(pytesseract.image_to_string(image))
         except Exception as e:
             logger.warning(f"OCR failed: {e}")
+        text = "\n".join(parts)
 
     return text.strip()
 
@@ -166,6 +182,44 @@ def extract_text_from_file(file_path: Path, file_extension: str) -> str:
 # ============================================================================
 
 
+def _import_fitz():
+    """Import PyMuPDF, which is optional, with an actionable error when it is missing."""
+    try:
+        import fitz  # PyMuPDF - import here to make it optional
+    except ImportError:
+        logger.error("PyMuPDF (fitz) not installed.")
+        raise ValueError(
+            "PDF to image conversion requires PyMuPDF (fitz). "
+            "Install with: pip install pymupdf."
+        )
+    return fitz
+
+
+def iter_pdf_page_images(file_path: Path) -> Iterator[Image.Image]:
+    """
+    Render PDF pages to PIL Images lazily, one page at a time.
+
+    Args:
+        file_path: Path to the PDF file
+
+    Yields:
+        PIL Image object for each page, in order
+
+    Raises:
+        ValueError: If PyMuPDF is not installed
+    """
+    fitz = _import_fitz()
+
+    with fitz.open(str(file_path)) as doc:
+        # Use 2x scaling (~200 DPI) for better OCR without huge memory
+        zoom = 2.0
+        matrix = fitz.Matrix(zoom, zoom)
+
+        for page in doc:
+            pix = page.get_pixmap(matrix=matrix, alpha=False)
+            yield Image.frombytes("RGB", [pix.width, pix.height], pix.samples)
+
+
 def convert_pdf_to_images(file_path: Path) -> List[Image.Image]:
     """
     Convert PDF pages to PIL Images for VLM analysis.
@@ -182,29 +236,10 @@ def convert_pdf_to_images(file_path: Path) -> List[Image.Image]:
         ValueError: If PDF conversion fails
         ImportError: If PyMuPDF is not installed
     """
-    try:
-        import fitz  # PyMuPDF - import here to make it optional
-    except ImportError:
-        logger.error("PyMuPDF (fitz) not installed.")
-        raise ValueError(
-            "PDF to image conversion requires PyMuPDF (fitz). "
-            "Install with: pip install pymupdf."
-        )
-    
-    try:
-        with fitz.open(str(file_path)) as doc:
-            images: List[Image.Image] = []
-
-            # Use 2x scaling (~200 DPI) for better OCR without huge memory
-            zoom = 2.0
-            matrix = fitz.Matrix(zoom, zoom)
+    _import_fitz()
 
-            for page in doc:
-                pix = page.get_pixmap(matrix=matrix, alpha=False)
-                img = Image.frombytes("RGB", [pix.width, pix.height], pix.samples)
-                images.append(img)
-
-        return images
+    try:
+        return list(iter_pdf_page_images(file_path))
     except Exception as e:
         logger.error(f"Failed to convert PDF to images: {e}")
         raise ValueError(f"PDF to image conversion failed: {str(e)}")
@@ -242,6 +277,33 @@ def convert_file_to_images(file_path: Path, file_extension: str) -> List[Image.I
 # ============================================================================
 
 
+def _save_and_extract(source: BinaryIO, file_path: Path, file_extension: str) -> str:
+    """
+    Copy the upload to disk in chunks and extract its text (blocking, run in a worker thread).
+
+    The content hash is computed during the copy; a file already seen is not parsed again.
+    """
+    digest = hashlib.sha256()
+    with file_path.open("wb") as buffer:
+        while chunk := source.read(UPLOAD_CHUNK_SIZE):
+            digest.update(chunk)
+            buffer.write(chunk)
+
+    cache_key = (digest.hexdigest(), file_extension)
+    with _extracted_text_cache_lock:
+        cached = _extracted_text_cache.get(cache_key)
+    if cached is not None:
+        logger.info("Reusing extracted text of an identical upload")
+        return cached
+
+    extracted_text = extract_text_from_file(file_path, file_extension)
+    # An empty result may be a transient extraction failure (e.g. OCR unavailable): retry it next time
+    if extracted_text.strip():
+        with _extracted_text_cache_lock:
+            _extracted_text_cache.set(cache_key, extracted_text)
+    return extracted_text
+
+
 async def upload_file(file: UploadFile = File(...)) -> Dict[str, Any]:
     """
     Handle file upload, validation, storage, and text extraction.
@@ -281,12 +343,9 @@ async def upload_file(file: UploadFile = File(...)) -> Dict[str, Any]:
     file_path = UPLOAD_DIR / safe_filename
 
     try:
-        # Save file
-        with file_path.open("wb") as buffer:
-            shutil.copyfileobj(file.file, buffer)
-
-        # Extract text from file
-        extracted_text = extract_text_from_file(file_path, file_extension)
+        # Save the file and extract its text off the event loop: the copy and the
+        # extraction (OCR on scanned PDFs) would otherwise stall every other request
+        extracted_text = await asyncio.to_thread(_save_and_extract, file.file, file_path, file_extension)
 
         return {
             "filename": safe_filename,
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, LargeBinary, Boolean, Text, Float, UniqueConstraint
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, LargeBinary, Boolean, Text, Float, Index, UniqueConstraint, desc, text
 from sqlalchemy.orm import declarative_base, relationship
 from sqlalchemy.sql import func
 from sqlalchemy.dialects.postgresql import ARRAY, JSON
@@ -8,6 +8,11 @@ Base = declarative_base()
 
 class User(Base):
     __tablename__ = "users"
+    # Partial index on the users the hourly offers job processes: it reads their ids
+    # without scanning the table and its cv_text blobs
+    __table_args__ = (
+        Index("ix_users_with_cv", "id", postgresql_where=text("cv_text IS NOT NULL AND cv_text <> ''")),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     username = Column(String, unique=True, nullable=False, index=True)
@@ -239,7 +244,11 @@ class Offres_FT(Base):
 class FavouriteMetier(Base):
     """User's favourite occupations (ROME codes) for the Tracker feature."""
     __tablename__ = "favourite_metiers"
-    __table_args__ = (UniqueConstraint("user_id", "rome_code", name="uq_favourite_metier_user_rome"),)
+    __table_args__ = (
+        UniqueConstraint("user_id", "rome_code", name="uq_favourite_metier_user_rome"),
+        # list_favourites reads one user's rows newest first straight from this index, no sort step
+        Index("ix_favourite_metiers_user_created", "user_id", desc("created_at")),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
@@ -274,6 +283,11 @@ class FavouriteJob(Base):
 
 class Metier_ROME(Base):
     __tablename__ = "metier_rome"
+    # Trigram GIN indexes (pg_trgm) so the "%q%" ILIKE search in list_metiers does not scan the table
+    __table_args__ = (
+        Index("ix_metier_rome_code_trgm", "code", postgresql_using="gin", postgresql_ops={"code": "gin_trgm_ops"}),
+        Index("ix_metier_rome_libelle_trgm", "libelle", postgresql_using="gin", postgresql_ops={"libelle": "gin_trgm_ops"}),
+    )
 
     code = Column(String, primary_key=True, index=True)
     libelle = Column(String, nullable=True)
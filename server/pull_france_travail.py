@@ -3,15 +3,20 @@ import pandas as pd
 import requests
 from tqdm.auto import tqdm
 from sqlalchemy import create_engine, inspect
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.exc import IntegrityError
 from server.models import Offres_FT
 import os
+import logging
 from dotenv import load_dotenv
 import json
+import orjson
 import re
 from datetime import datetime, timedelta
 
+logger = logging.getLogger(__name__)
+
 load_dotenv()
 DATABASE_URL = os.getenv("DATABASE_URL")
 
@@ -54,8 +59,11 @@ def get_access_token(CLIENT_ID, CLIENT_SECRET, AUTH_URL) -> str:
     return token
 
 
-def search_offers(API_URL, NB_OFFRE, CLIENT_ID, CLIENT_SECRET, AUTH_URL) -> list[dict]:
-    offers = []
+def search_offers(API_URL, NB_OFFRE, CLIENT_ID, CLIENT_SECRET, AUTH_URL) -> int:
+    # Each page is saved as soon as it arrives: only keep the running count and the
+    # last offer (for the next maxCreationDate), not every offer ever fetched
+    total_offers = 0
+    last_offer = None
     token = get_access_token(CLIENT_ID, CLIENT_SECRET, AUTH_URL)
     start_date = datetime(2020, 1, 1)
 
@@ -88,10 +96,12 @@ def search_offers(API_URL, NB_OFFRE, CLIENT_ID, CLIENT_SECRET, AUTH_URL) -> list
                     }
                     resp = requests.get(API_URL, headers=headers, params=params)
                     resp.raise_for_status()
-                    data = resp.json()
+                    data = orjson.loads(resp.content)
                 except Exception as e:
-                    print(f"Error: {e}")
-                    print(f"Response: {resp.text if 'resp' in locals() else 'No response'}")
+                    logger.warning("Page %s-%s failed, refreshing token: %s", page_start, page_end, e)
+                    if logger.isEnabledFor(logging.DEBUG):
+                        # Decoding the body is only worth it when someone reads it
+                        logger.debug("Response: %s", resp.text if 'resp' in locals() else 'No response')
                     token = get_access_token(CLIENT_ID, CLIENT_SECRET, AUTH_URL)
                     headers = {
                         "Authorization": f"Bearer {token}",
@@ -105,7 +115,7 @@ def search_offers(API_URL, NB_OFFRE, CLIENT_ID, CLIENT_SECRET, AUTH_URL) -> list
                     }
                     resp = requests.get(API_URL, headers=headers, params=params)
                     resp.raise_for_status()
-                    data = resp.json()
+                    data = orjson.loads(resp.content)
 
                 results = data.get("resultats", [])
                 if not results:
@@ -113,7 +123,8 @@ def search_offers(API_URL, NB_OFFRE, CLIENT_ID, CLIENT_SECRET, AUTH_URL) -> list
                     has_more_results = False
                     break
 
-                offers += results
+                total_offers += len(results)
+                last_offer = results[-1]
 
                 # Save results to database immediately
                 save_offers_to_db(results)
@@ -122,7 +133,7 @@ def search_offers(API_URL, NB_OFFRE, CLIENT_ID, CLIENT_SECRET, AUTH_URL) -> list
                     "maxCreationDate": max_creation_date.strftime('%Y-%m-%d %H:%M:%S'),
                     "page": f"{page_start}-{page_end}",
                     "retrieved": len(results),
-                    "total": len(offers)
+                    "total": total_offers
                 })
                 pbar.update(1)
 
@@ -133,8 +144,8 @@ def search_offers(API_URL, NB_OFFRE, CLIENT_ID, CLIENT_SECRET, AUTH_URL) -> list
                     page_start += 150
 
             # Use the last offer's creation date as the new maxCreationDate for the next request
-            if offers:
-                last_offer_date_str = offers[-1].get("dateCreation")
+            if last_offer:
+                last_offer_date_str = last_offer.get("dateCreation")
                 if last_offer_date_str:
                     max_creation_date = datetime.fromisoformat(
                         last_offer_date_str.replace('Z', '+00:00')).replace(tzinfo=None)
@@ -145,7 +156,7 @@ def search_offers(API_URL, NB_OFFRE, CLIENT_ID, CLIENT_SECRET, AUTH_URL) -> list
             else:
                 break
 
-    return offers
+    return total_offers
 
 
 # Create a session factory
@@ -153,108 +164,122 @@ engine = create_engine(DATABASE_URL)
 Session = sessionmaker(bind=engine)
 
 
+def _offer_to_row(offer: dict) -> dict:
+    """Map a France Travail offer to an offres_FT row (column name -> value)."""
+    contact = offer.get("contact") or {}
+    origine = offer.get("origineOffre") or {}
+    agence = offer.get("agence") or {}
+
+    # Extract application URL from contact info
+    # Priority: explicit urlPostulation > URL in contact fields > URL in agence courriel > URL in origineOffre
+    contact_url_postulation = contact.get("urlPostulation")
+    if not contact_url_postulation:
+        for field in ["coordonnees3", "coordonnees2", "coordonnees1"]:
+            extracted = _extract_url_from_text(contact.get(field, ""))
+            if extracted:
+                contact_url_postulation = extracted
+                break
+
+    if not contact_url_postulation:
+        contact_url_postulation = _extract_url_from_text(agence.get("courriel", ""))
+
+    if not contact_url_postulation:
+        contact_url_postulation = origine.get("urlOrigine")
+
+    return {
+        "id": offer.get("id"),
+        "intitule": offer.get("intitule"),
+        "description": offer.get("description"),
+        "dateCreation": offer.get("dateCreation"),
+        "dateActualisation": offer.get("dateActualisation"),
+        "romeCode": offer.get("romeCode"),
+        "romeLibelle": offer.get("romeLibelle"),
+        "appellationlibelle": offer.get("appellationlibelle"),
+        "typeContrat": offer.get("typeContrat"),
+        "typeContratLibelle": offer.get("typeContratLibelle"),
+        "natureContrat": offer.get("natureContrat"),
+        "experienceExige": offer.get("experienceExige"),
+        "experienceLibelle": offer.get("experienceLibelle"),
+        "competences": json.dumps(offer.get("competences")),
+        "dureeTravailLibelle": offer.get("dureeTravailLibelle"),
+        "dureeTravailLibelleConverti": offer.get("dureeTravailLibelleConverti"),
+        "alternance": offer.get("alternance"),
+        "nombrePostes": offer.get("nombrePostes"),
+        "accessibleTH": offer.get("accessibleTH"),
+        "qualificationCode": offer.get("qualificationCode"),
+        "qualificationLibelle": offer.get("qualificationLibelle"),
+        "codeNAF": offer.get("codeNAF"),
+        "secteurActivite": offer.get("secteurActivite"),
+        "secteurActiviteLibelle": offer.get("secteurActiviteLibelle"),
+        "offresManqueCandidats": offer.get("offresManqueCandidats"),
+        "entrepriseAdaptee": offer.get("entrepriseAdaptee"),
+        "employeurHandiEngage": offer.get("employeurHandiEngage"),
+        "lieuTravail_libelle": offer.get("lieuTravail", {}).get("libelle"),
+        "lieuTravail_latitude": offer.get("lieuTravail", {}).get("latitude"),
+        "lieuTravail_longitude": offer.get("lieuTravail", {}).get("longitude"),
+        "lieuTravail_codePostal": offer.get("lieuTravail", {}).get("codePostal"),
+        "lieuTravail_commune": offer.get("lieuTravail", {}).get("commune"),
+        "entreprise_nom": offer.get("entreprise", {}).get("nom"),
+        "entreprise_entrepriseAdaptee": offer.get("entreprise", {}).get("entrepriseAdaptee"),
+        "salaire_libelle": offer.get("salaire", {}).get("libelle"),
+        "salaire_complement1": offer.get("salaire", {}).get("complement1"),
+        "salaire_listeComplements": json.dumps(offer.get("salaire", {}).get("listeComplements")),
+        "contact_nom": contact.get("nom"),
+        "contact_coordonnees1": contact.get("coordonnees1"),
+        "contact_coordonnees2": contact.get("coordonnees2"),
+        "contact_coordonnees3": contact.get("coordonnees3"),
+        "contact_courriel": contact.get("courriel"),
+        "contact_urlPostulation": contact_url_postulation,
+        "contact_telephone": contact.get("telephone"),
+        "origineOffre_origine": origine.get("origine"),
+        "origineOffre_urlOrigine": origine.get("urlOrigine"),
+        "contexteTravail_horaires": json.dumps(offer.get("contexteTravail", {}).get("horaires")),
+        "contexteTravail_conditionsExercice": offer.get("contexteTravail", {}).get("conditionsExercice"),
+        "formations": json.dumps(offer.get("formations")),
+        "qualitesProfessionnelles": json.dumps(offer.get("qualitesProfessionnelles")),
+        "langues": json.dumps(offer.get("langues")),
+        "permis": json.dumps(offer.get("permis")),
+        "entreprise_logo": offer.get("entreprise", {}).get("logo"),
+        "entreprise_description": offer.get("entreprise", {}).get("description"),
+        "entreprise_url": offer.get("entreprise", {}).get("url"),
+        "agence_courriel": agence.get("courriel"),
+        "salaire_commentaire": offer.get("salaire", {}).get("commentaire"),
+        "deplacementCode": offer.get("deplacementCode"),
+        "deplacementLibelle": offer.get("deplacementLibelle"),
+        "trancheEffectifEtab": offer.get("trancheEffectifEtab"),
+        "experienceCommentaire": offer.get("experienceCommentaire"),
+    }
+
+
 def save_offers_to_db(offers: list[dict]) -> None:
     if not offers:
-        print("Aucune offre reçue, rien à sauvegarder.")
+        logger.warning("Aucune offre reçue, rien à sauvegarder.")
         return
 
+    rows = [_offer_to_row(offer) for offer in offers]
+    # One multi-row INSERT and one commit per page; offers already in the table are skipped by the DB
+    stmt = pg_insert(Offres_FT).on_conflict_do_nothing(index_elements=[Offres_FT.id])
+
     session = Session()
     try:
-        for offer in offers:
-            contact = offer.get("contact") or {}
-            origine = offer.get("origineOffre") or {}
-            agence = offer.get("agence") or {}
-            
-            # Extract application URL from contact info
-            # Priority: explicit urlPostulation > URL in contact fields > URL in agence courriel > URL in origineOffre
-            contact_url_postulation = contact.get("urlPostulation")
-            if not contact_url_postulation:
-                for field in ["coordonnees3", "coordonnees2", "coordonnees1"]:
-                    extracted = _extract_url_from_text(contact.get(field, ""))
-                    if extracted:
-                        contact_url_postulation = extracted
-                        break
-            
-            if not contact_url_postulation:
-                contact_url_postulation = _extract_url_from_text(agence.get("courriel", ""))
-            
-            if not contact_url_postulation:
-                contact_url_postulation = origine.get("urlOrigine")
-            
-            offre = Offres_FT(
-                id=offer.get("id"),
-                intitule=offer.get("intitule"),
-                description=offer.get("description"),
-                dateCreation=offer.get("dateCreation"),
-                dateActualisation=offer.get("dateActualisation"),
-                romeCode=offer.get("romeCode"),
-                romeLibelle=offer.get("romeLibelle"),
-                appellationlibelle=offer.get("appellationlibelle"),
-                typeContrat=offer.get("typeContrat"),
-                typeContratLibelle=offer.get("typeContratLibelle"),
-                natureContrat=offer.get("natureContrat"),
-                experienceExige=offer.get("experienceExige"),
-                experienceLibelle=offer.get("experienceLibelle"),
-                competences=json.dumps(offer.get("competences")),
-                dureeTravailLibelle=offer.get("dureeTravailLibelle"),
-                dureeTravailLibelleConverti=offer.get("dureeTravailLibelleConverti"),
-                alternance=offer.get("alternance"),
-                nombrePostes=offer.get("nombrePostes"),
-                accessibleTH=offer.get("accessibleTH"),
-                qualificationCode=offer.get("qualificationCode"),
-                qualificationLibelle=offer.get("qualificationLibelle"),
-                codeNAF=offer.get("codeNAF"),
-                secteurActivite=offer.get("secteurActivite"),
-                secteurActiviteLibelle=offer.get("secteurActiviteLibelle"),
-                offresManqueCandidats=offer.get("offresManqueCandidats"),
-                entrepriseAdaptee=offer.get("entrepriseAdaptee"),
-                employeurHandiEngage=offer.get("employeurHandiEngage"),
-                lieuTravail_libelle=offer.get("lieuTravail", {}).get("libelle"),
-                lieuTravail_latitude=offer.get("lieuTravail", {}).get("latitude"),
-                lieuTravail_longitude=offer.get("lieuTravail", {}).get("longitude"),
-                lieuTravail_codePostal=offer.get("lieuTravail", {}).get("codePostal"),
-                lieuTravail_commune=offer.get("lieuTravail", {}).get("commune"),
-                entreprise_nom=offer.get("entreprise", {}).get("nom"),
-                entreprise_entrepriseAdaptee=offer.get("entreprise", {}).get("entrepriseAdaptee"),
-                salaire_libelle=offer.get("salaire", {}).get("libelle"),
-                salaire_complement1=offer.get("salaire", {}).get("complement1"),
-                salaire_listeComplements=json.dumps(offer.get("salaire", {}).get("listeComplements")),
-                contact_nom=contact.get("nom"),
-                contact_coordonnees1=contact.get("coordonnees1"),
-                contact_coordonnees2=contact.get("coordonnees2"),
-                contact_coordonnees3=contact.get("coordonnees3"),
-                contact_courriel=contact.get("courriel"),
-                contact_urlPostulation=contact_url_postulation,
-                contact_telephone=contact.get("telephone"),
-                origineOffre_origine=origine.get("origine"),
-                origineOffre_urlOrigine=origine.get("urlOrigine"),
-                contexteTravail_horaires=json.dumps(offer.get("contexteTravail", {}).get("horaires")),
-                contexteTravail_conditionsExercice=offer.get("contexteTravail", {}).get("conditionsExercice"),
-                formations=json.dumps(offer.get("formations")),
-                qualitesProfessionnelles=json.dumps(offer.get("qualitesProfessionnelles")),
-                langues=json.dumps(offer.get("langues")),
-                permis=json.dumps(offer.get("permis")),
-                entreprise_logo=offer.get("entreprise", {}).get("logo"),
-                entreprise_description=offer.get("entreprise", {}).get("description"),
-                entreprise_url=offer.get("entreprise", {}).get("url"),
-                agence_courriel=agence.get("courriel"),
-                salaire_commentaire=offer.get("salaire", {}).get("commentaire"),
-                deplacementCode=offer.get("deplacementCode"),
-                deplacementLibelle=offer.get("deplacementLibelle"),
-                trancheEffectifEtab=offer.get("trancheEffectifEtab"),
-                experienceCommentaire=offer.get("experienceCommentaire"),
-            )
-            try:
-                session.add(offre)
-                session.commit()
-            except IntegrityError:
-                session.rollback()
-                # Skip duplicate entries
-                continue
+        try:
+            session.execute(stmt, rows)
+            session.commit()
+        except IntegrityError:
+            # Another constraint rejected a row (e.g. missing intitule): fall back to one row at a time
+            # so that only the invalid offers are skipped
+            session.rollback()
+            for row in rows:
+                try:
+                    session.execute(stmt, [row])
+                    session.commit()
+                except IntegrityError:
+                    session.rollback()
+                    continue
 
     except Exception as e:
         session.rollback()
-        print(f"Erreur lors de la sauvegarde des offres : {e}")
+        logger.error("Erreur lors de la sauvegarde des offres : %s", e)
     finally:
         session.close()
 
@@ -264,6 +289,7 @@ def get_offers(API_URL, NB_OFFRE, CLIENT_ID, CLIENT_SECRET, AUTH_URL):
 
 
 if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
     API_URL = "https://api.francetravail.io/partenaire/offresdemploi/v2/offres/search"
     NB_OFFRE = 1000
     CLIENT_ID = "PAR_dux_dc80f0f45695a7c5d5baec8923f9fe0180cdfbf90d29c35307a8014e3275b200"
@@ -4,12 +4,12 @@ Advisor (orientation / cover letter / CV tips) chat router.
 Provides endpoints for advisor context, conversation CRUD, and chat with persistence.
 """
 
-import json
 import logging
 from datetime import datetime, timezone
 from typing import Any, Literal, Optional
 
 import asyncio
+import orjson
 from fastapi import APIRouter, Depends, HTTPException
 from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
@@ -108,10 +108,25 @@ class ChatResponse(BaseModel):
 # ============================================================================
 
 
+def _sse_event(payload: dict[str, Any]) -> bytes:
+    """Encode one server-sent event (the stream emits one per LLM token)."""
+    return b"data: " + orjson.dumps(payload) + b"\n\n"
+
+
 def _latest_evaluation_summary(db: Session, user_id: int) -> Optional[dict[str, Any]]:
     """Return a summary dict of the latest completed CV evaluation for the user."""
+    # Only the summary columns: the structured CV / scores / visual analysis JSON blobs
+    # are the bulk of the row and would be decoded for nothing on every advisor message
     ev = (
-        db.query(CVEvaluation)
+        db.query(
+            CVEvaluation.overall_score,
+            CVEvaluation.overall_summary,
+            CVEvaluation.strengths,
+            CVEvaluation.weaknesses,
+            CVEvaluation.recommendations,
+            CVEvaluation.red_flags,
+            CVEvaluation.missing_info,
+        )
         .filter(
             CVEvaluation.user_id == user_id,
             CVEvaluation.evaluation_status == "completed",
@@ -134,19 +149,18 @@ def _latest_evaluation_summary(db: Session, user_id: int) -> Optional[dict[str,
 
 def _latest_structured_cv(db: Session, user_id: int) -> Optional[dict[str, Any]]:
     """Return the structured_cv JSON from the latest completed CV evaluation, or None."""
-    ev = (
-        db.query(CVEvaluation)
+    structured_cv = (
+        db.query(CVEvaluation.structured_cv)
         .filter(
             CVEvaluation.user_id == user_id,
             CVEvaluation.evaluation_status == "completed",
             CVEvaluation.structured_cv.isnot(None),
         )
         .order_by(CVEvaluation.created_at.desc())
-        .first()
+        .limit(1)
+        .scalar()
     )
-    if not ev or not ev.structured_cv:
-        return None
-    return ev.structured_cv
+    return structured_cv or None
 
 
 def _format_structured_cv_for_prompt(scv: dict[str, Any]) -> str:
@@ -211,7 +225,13 @@ def _format_structured_cv_for_prompt(scv: dict[str, Any]) -> str:
 def _favourite_jobs_list(db: Session, user_id: int) -> list[dict[str, Any]]:
     """Return list of favourite jobs for the user (same shape as jobs router)."""
     rows = (
-        db.query(FavouriteJob)
+        db.query(
+            FavouriteJob.job_id,
+            FavouriteJob.intitule,
+            FavouriteJob.entreprise_nom,
+            FavouriteJob.rome_code,
+            FavouriteJob.created_at,
+        )
         .filter(FavouriteJob.user_id == user_id)
         .order_by(FavouriteJob.created_at.desc())
         .all()
@@ -320,7 +340,7 @@ async def list_conversations(
 ) -> list[ConversationListItem]:
     """List conversations for the sidebar, ordered by updated_at desc."""
     rows = (
-        db.query(AdvisorConversation)
+        db.query(AdvisorConversation.id, AdvisorConversation.title, AdvisorConversation.updated_at)
         .filter(AdvisorConversation.user_id == current_user.id)
         .order_by(AdvisorConversation.updated_at.desc())
         .all()
@@ -590,7 +610,7 @@ async def post_chat_stream(
                 max_tokens=2000,
             ):
                 reply_parts.append(chunk)
-                yield f"data: {json.dumps({'content': chunk})}\n\n"
+                yield _sse_event({'content': chunk})
         except ValueError as e:
             error_db = SessionLocal()
             try:
@@ -609,7 +629,7 @@ async def post_chat_stream(
                 error_db.rollback()
             finally:
                 error_db.close()
-            yield f"data: {json.dumps({'error': str(e)})}\n\n"
+            yield _sse_event({'error': str(e)})
             return
         reply = "".join(reply_parts)
         fresh_db = SessionLocal()
@@ -626,11 +646,11 @@ async def post_chat_stream(
                 extra={"conversation_id": conversation_id},
             )
             fresh_db.rollback()
-            yield f"data: {json.dumps({'error': 'db persistence failed'})}\n\n"
+            yield _sse_event({'error': 'db persistence failed'})
             return
         finally:
             fresh_db.close()
-        yield f"data: {json.dumps({'done': True, 'conversationId': conversation_id})}\n\n"
+        yield _sse_event({'done': True, 'conversationId': conversation_id})
 
     return StreamingResponse(
         sse_stream(),
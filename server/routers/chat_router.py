@@ -62,7 +62,15 @@ async def get_optimal_offers(
     if not current_user.cv_text:
         return {"success": True, "offers": []}
 
-    optimal_offers = db.query(OptimalOffer).filter(
+    # Row tuples of the returned columns rather than full OptimalOffer entities
+    optimal_offers = db.query(
+        OptimalOffer.id,
+        OptimalOffer.job_id,
+        OptimalOffer.position,
+        OptimalOffer.score,
+        OptimalOffer.match_reasons,
+        OptimalOffer.concerns,
+    ).filter(
         OptimalOffer.user_id == current_user.id
     ).order_by(OptimalOffer.position).all()
 
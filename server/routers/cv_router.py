@@ -5,6 +5,7 @@ and viewing evaluation history.
 """
 
 import logging
+from itertools import chain, islice
 from pathlib import Path
 from typing import Dict, Any, List, Optional
 
@@ -336,44 +337,25 @@ def _deduplicate_recommendations(recommendations: List[tuple[str, str]]) -> List
         List of unique recommendations
     """
     unique = []
-    seen_lower = set()
+    # Normalized text (lowercase, strip) -> index of its entry in `unique`, in insertion order
+    seen: Dict[str, int] = {}
     
     for source_type, rec in recommendations:
-        # Normalize for comparison (lowercase, strip)
         rec_normalized = rec.lower().strip()
         
-        # Check if similar recommendation already exists
-        is_duplicate = False
-        to_remove = None  # Track which seen_rec to remove if replacing
-        to_replace_index = None  # Track which unique entry to replace
-        
-        for seen_rec in seen_lower:
-            # Simple substring matching for duplicates
-            if rec_normalized in seen_rec or seen_rec in rec_normalized:
-                # If one is significantly longer, prefer the longer one
-                if len(rec_normalized) > len(seen_rec) * 1.5:
-                    # Mark for replacement (don't modify sets/lists during iteration)
-                    to_remove = seen_rec
-                    # Find the index in unique to replace
-                    for idx, (_, existing_rec) in enumerate(unique):
-                        if existing_rec.lower().strip() == seen_rec:
-                            to_replace_index = idx
-                            break
-                    break
-                else:
-                    is_duplicate = True
-                    break
-        
-        # Perform updates after iteration
-        if to_remove is not None:
-            # Replace shorter with longer
-            seen_lower.remove(to_remove)
-            if to_replace_index is not None:
-                unique[to_replace_index] = (source_type, rec)
-            seen_lower.add(rec_normalized)
-        elif not is_duplicate:
+        # Simple substring matching for duplicates
+        match = next(
+            (seen_rec for seen_rec in seen if rec_normalized in seen_rec or seen_rec in rec_normalized),
+            None,
+        )
+        if match is None:
+            seen[rec_normalized] = len(unique)
             unique.append((source_type, rec))
-            seen_lower.add(rec_normalized)
+        elif len(rec_normalized) > len(match) * 1.5:
+            # If one is significantly longer, prefer the longer one (same slot, no rescan of `unique`)
+            index = seen.pop(match)
+            unique[index] = (source_type, rec)
+            seen[rec_normalized] = index
     
     return unique
 
@@ -416,11 +398,13 @@ def merge_and_prioritize_recommendations(
     # Remove duplicates
     unique_recs = _deduplicate_recommendations(all_recs)
     
-    # Sort by priority (content first, then visual) while preserving original order within each bucket
-    unique_recs.sort(key=lambda x: (x[0] == "visual"))
-    
-    # Return top N
-    return [rec[1] for rec in unique_recs[:max_recommendations]]
+    # Content first, then visual, original order within each bucket: a stable two-way
+    # partition, consumed only until the top N are taken instead of sorting the whole list
+    prioritized = chain(
+        (rec for source_type, rec in unique_recs if source_type != "visual"),
+        (rec for source_type, rec in unique_recs if source_type == "visual"),
+    )
+    return list(islice(prioritized, max_recommendations))
 
 
 def run_cv_evaluation(user_id: int, cv_text: str, cv_filename: str, db_session_factory) -> None:
@@ -1040,8 +1024,14 @@ async def get_evaluation_history(
     # Clamp limit to valid range
     limit = max(1, min(limit, MAX_EVAL_LIMIT))
 
+    # Summary view: project the four columns instead of hydrating every JSON blob
     evaluations = (
-        db.query(CVEvaluation)
+        db.query(
+            CVEvaluation.id,
+            CVEvaluation.overall_score,
+            CVEvaluation.cv_filename,
+            CVEvaluation.created_at,
+        )
         .filter(CVEvaluation.user_id == current_user.id)
         .order_by(CVEvaluation.created_at.desc())
         .limit(limit)
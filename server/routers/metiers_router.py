@@ -5,15 +5,26 @@ Provides endpoints for fetching metier fiche data from the database
 and for user favourite occupations (Tracker feature).
 """
 
-from typing import Any, Dict, List, Optional
+import gzip
+import hashlib
+import time
+from datetime import datetime
+from itertools import batched
+from typing import Any, AsyncIterator, Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
 
-from fastapi import APIRouter, Depends, HTTPException, Query
+import orjson
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
-from sqlalchemy.exc import IntegrityError
+from sqlalchemy import delete, func, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from server.database import get_db_session
+from server.config import settings
+from server.database import AsyncSessionLocal, get_async_db_session, get_db_session
 from server.models import FavouriteMetier, Metier_ROME, User
+from server.utils.cache import TTLCache
 from server.utils.dependencies import get_current_user
 
 import logging
@@ -31,7 +42,7 @@ class AddFavouritePayload(BaseModel):
 class FavouriteResponse(BaseModel):
     romeCode: str
     romeLibelle: Optional[str] = None
-    addedAt: Optional[str] = None
+    addedAt: Optional[datetime] = None  # serialized to ISO 8601 by the response encoder
 
 
 class FavouritesListResponse(BaseModel):
@@ -42,34 +53,180 @@ def _map_competences(competences: Any) -> List[Dict[str, str]]:
     if not competences:
         return []
 
-    mapped: List[Dict[str, str]] = []
-    for item in competences:
-        if isinstance(item, dict):
-            label = item.get("libelle") or item.get("label")
-            if label:
-                mapped.append({"libelle": str(label)})
-        elif isinstance(item, str):
-            mapped.append({"libelle": item})
-    return mapped
+    # Dicts without a usable label and non-string items map to None and are dropped.
+    # Binding isinstance/dict/str to locals was measured at ~1% on 4k items: not worth the noise.
+    labels = (
+        (item.get("libelle") or item.get("label") or None) if isinstance(item, dict)
+        else item if isinstance(item, str) else None
+        for item in competences
+    )
+    return [{"libelle": str(label)} for label in labels if label is not None]
 
 
-def _chunk_list(items: List[Any], size: int) -> List[List[Any]]:
-    return [items[i:i + size] for i in range(0, len(items), size)]
+def _chunk_list(items: Iterable[Any], size: int) -> Iterator[Tuple[Any, ...]]:
+    # Lazy: one batch in memory at a time, and any iterable works, not just lists
+    return batched(items, size)
 
 
-@router.get("", summary="List metiers from database")
-def list_metiers(
-    q: Optional[str] = Query(None, description="Filter by code or libelle"),
-    db: Session = Depends(get_db_session),
-) -> List[Dict[str, str]]:
-    query = db.query(Metier_ROME)
-    if q:
-        like = f"%{q.strip()}%"
-        query = query.filter(
-            (Metier_ROME.code.ilike(like)) | (Metier_ROME.libelle.ilike(like))
+class _MetiersList(NamedTuple):
+    """The unfiltered ROME list, fetched once and shared by the list and fiche endpoints."""
+    expires_at: float
+    etag: str
+    body: bytes
+    gzipped: bytes
+    libelles: Dict[str, Optional[str]]
+
+
+# Replaced as a whole, never mutated in place
+_metiers_list: Optional[_MetiersList] = None
+
+# (etag, serialized body) per normalized search; broad searches return most of the
+# referential, so only results up to _SEARCH_CACHE_MAX_BYTES are kept
+_search_cache = TTLCache(ttl=settings.metiers_cache_ttl_seconds, maxsize=256)
+_SEARCH_CACHE_MAX_BYTES = 64 * 1024
+
+
+def invalidate_metiers_list() -> None:
+    """Drop the cached ROME list and searches, e.g. after the metier_rome table was reloaded."""
+    global _metiers_list
+    _metiers_list = None
+    _search_cache.clear()
+
+
+def _etag(body: bytes) -> str:
+    return '"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+
+
+async def _cached_metiers_list(db: AsyncSession) -> _MetiersList:
+    """
+    Return the full ROME list, serialized (plain and gzipped) and indexed by code.
+
+    The database is queried, and the body compressed, at most once per TTL.
+    """
+    global _metiers_list
+    cached = _metiers_list
+    if cached is not None and time.monotonic() < cached.expires_at:
+        return cached
+
+    rows = (
+        await db.execute(
+            select(Metier_ROME.code, Metier_ROME.libelle).order_by(Metier_ROME.libelle.asc(), Metier_ROME.code.asc())
         )
-    rows = query.order_by(Metier_ROME.libelle.asc(), Metier_ROME.code.asc()).all()
-    return [{"romeCode": row.code, "romeLibelle": row.libelle or ""} for row in rows]
+    ).all()
+    body = orjson.dumps([{"romeCode": code, "romeLibelle": libelle or ""} for code, libelle in rows])
+    _metiers_list = _MetiersList(
+        expires_at=time.monotonic() + settings.metiers_cache_ttl_seconds,
+        etag=_etag(body),
+        body=body,
+        # The repetitive JSON compresses several times over; mtime=0 keeps the bytes stable
+        gzipped=gzip.compress(body, mtime=0),
+        libelles=dict(rows),
+    )
+    return _metiers_list
+
+
+async def warm_metiers_list() -> None:
+    """Build the cached ROME list ahead of the first request (called at startup)."""
+    async with AsyncSessionLocal() as db:
+        await _cached_metiers_list(db)
+
+
+async def _stream_metiers(q: str) -> AsyncIterator[bytes]:
+    """
+    Serialize the metiers matching `q` as a JSON array, one cursor batch at a time.
+
+    Uses its own session: the request-scoped one may be closed before the body is sent.
+    """
+    # ILIKE '%q%' is served by the pg_trgm GIN indexes on code and libelle (see Metier_ROME)
+    like = f"%{q}%"
+    stmt = (
+        select(Metier_ROME.code, Metier_ROME.libelle)
+        .where((Metier_ROME.code.ilike(like)) | (Metier_ROME.libelle.ilike(like)))
+        .order_by(Metier_ROME.libelle.asc(), Metier_ROME.code.asc())
+        .execution_options(yield_per=500)
+    )
+    yield b"["
+    separator = b""
+    async with AsyncSessionLocal() as db:
+        result = await db.stream(stmt)
+        async for rows in result.partitions():
+            yield separator + b",".join(
+                orjson.dumps({"romeCode": code, "romeLibelle": libelle or ""}) for code, libelle in rows
+            )
+            separator = b","
+    yield b"]"
+
+
+async def _stream_and_cache_metiers(q: str, cache_key: str) -> AsyncIterator[bytes]:
+    """Stream the search results and keep the complete body for the next identical search."""
+    chunks: List[bytes] = []
+    async for chunk in _stream_metiers(q):
+        chunks.append(chunk)
+        yield chunk
+    body = b"".join(chunks)
+    if len(body) <= _SEARCH_CACHE_MAX_BYTES:
+        _search_cache.set(cache_key, (_etag(body), body))
+
+
+def _accepts_gzip(accept_encoding: str) -> bool:
+    """Whether an Accept-Encoding header allows gzip, honouring q-values (gzip;q=0 is a refusal)."""
+    wildcard_q = None
+    for item in accept_encoding.split(","):
+        coding, *params = (part.strip() for part in item.split(";"))
+        q = 1.0
+        for param in params:
+            name, _, value = param.partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        coding = coding.lower()
+        if coding == "gzip":
+            # An explicit gzip entry overrides the wildcard
+            return q > 0
+        if coding == "*":
+            wildcard_q = q
+    return wildcard_q is not None and wildcard_q > 0
+
+
+def _json_response(
+    request: Request, etag: str, body: bytes, extra_headers: Optional[Dict[str, str]] = None
+) -> Response:
+    """Serve a cached JSON body, or 304 if the client already holds this version."""
+    headers = {"ETag": etag, "Cache-Control": "no-cache", **(extra_headers or {})}
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+@router.get("", summary="List metiers from database", response_model=None)
+async def list_metiers(
+    request: Request,
+    q: Optional[str] = Query(None, description="Filter by code or libelle"),
+    db: AsyncSession = Depends(get_async_db_session),
+) -> Response:
+    q = (q or "").strip()
+    if not q:
+        # The whole referential: served from memory, and not even re-sent if the client has it
+        metiers = await _cached_metiers_list(db)
+        if _accepts_gzip(request.headers.get("accept-encoding", "")):
+            # Each representation needs its own validator
+            return _json_response(
+                request,
+                metiers.etag[:-1] + '-gzip"',
+                metiers.gzipped,
+                {"Content-Encoding": "gzip", "Vary": "Accept-Encoding"},
+            )
+        return _json_response(request, metiers.etag, metiers.body, {"Vary": "Accept-Encoding"})
+
+    # ILIKE is case-insensitive, so searches differing only by case share an entry
+    cache_key = q.lower()
+    cached = _search_cache.get(cache_key)
+    if cached is not None:
+        return _json_response(request, *cached)
+
+    return StreamingResponse(_stream_and_cache_metiers(q, cache_key), media_type="application/json")
 
 
 # ---------------------------------------------------------------------------
@@ -82,24 +239,25 @@ def list_metiers(
     summary="List current user's favourite occupations",
     response_model=FavouritesListResponse,
 )
-def list_favourites(
-    db: Session = Depends(get_db_session),
+async def list_favourites(
+    db: AsyncSession = Depends(get_async_db_session),
     current_user: User = Depends(get_current_user),
 ) -> FavouritesListResponse:
     rows = (
-        db.query(FavouriteMetier)
-        .filter(FavouriteMetier.user_id == current_user.id)
-        .order_by(FavouriteMetier.created_at.desc())
-        .all()
-    )
+        await db.execute(
+            select(FavouriteMetier.rome_code, FavouriteMetier.rome_libelle, FavouriteMetier.created_at)
+            .where(FavouriteMetier.user_id == current_user.id)
+            .order_by(FavouriteMetier.created_at.desc())
+        )
+    ).all()
     return FavouritesListResponse(
         favourites=[
             FavouriteResponse(
-                romeCode=r.rome_code,
-                romeLibelle=r.rome_libelle or r.rome_code,
-                addedAt=r.created_at.isoformat() if r.created_at else None,
+                romeCode=rome_code,
+                romeLibelle=rome_libelle or rome_code,
+                addedAt=created_at,
             )
-            for r in rows
+            for rome_code, rome_libelle, created_at in rows
         ]
     )
 
@@ -109,63 +267,34 @@ def list_favourites(
     summary="Add occupation to favourites",
     response_model=FavouriteResponse,
 )
-def add_favourite(
+async def add_favourite(
     payload: AddFavouritePayload,
-    db: Session = Depends(get_db_session),
+    db: AsyncSession = Depends(get_async_db_session),
     current_user: User = Depends(get_current_user),
 ) -> FavouriteResponse:
     code = (payload.romeCode or "").strip()
     if not code:
         raise HTTPException(status_code=400, detail="romeCode is required")
-    existing = (
-        db.query(FavouriteMetier)
-        .filter(
-            FavouriteMetier.user_id == current_user.id,
-            FavouriteMetier.rome_code == code,
-        )
-        .first()
-    )
-    if existing:
-        return FavouriteResponse(
-            romeCode=existing.rome_code,
-            romeLibelle=existing.rome_libelle or existing.rome_code,
-            addedAt=existing.created_at.isoformat() if existing.created_at else None,
-        )
     libelle = (payload.romeLibelle or "").strip() or None
-    fm = FavouriteMetier(
+
+    # One round-trip, race-free: insert, or hand back the existing favourite (only filling a missing libelle)
+    stmt = pg_insert(FavouriteMetier).values(
         user_id=current_user.id,
         rome_code=code,
         rome_libelle=libelle,
     )
-    try:
-        db.add(fm)
-        db.commit()
-        db.refresh(fm)
-        return FavouriteResponse(
-            romeCode=fm.rome_code,
-            romeLibelle=fm.rome_libelle or fm.rome_code,
-            addedAt=fm.created_at.isoformat() if fm.created_at else None,
-        )
-    except IntegrityError:
-        db.rollback()
-        existing = (
-            db.query(FavouriteMetier)
-            .filter(
-                FavouriteMetier.user_id == current_user.id,
-                FavouriteMetier.rome_code == code,
-            )
-            .first()
-        )
-        if not existing:
-            raise HTTPException(
-                status_code=409,
-                detail="Duplicate favourite occupation; concurrent insert. Retry to fetch existing.",
-            )
-        return FavouriteResponse(
-            romeCode=existing.rome_code,
-            romeLibelle=existing.rome_libelle or existing.rome_code,
-            addedAt=existing.created_at.isoformat() if existing.created_at else None,
-        )
+    stmt = stmt.on_conflict_do_update(
+        constraint="uq_favourite_metier_user_rome",
+        set_={"rome_libelle": func.coalesce(FavouriteMetier.rome_libelle, stmt.excluded.rome_libelle)},
+    ).returning(FavouriteMetier.rome_code, FavouriteMetier.rome_libelle, FavouriteMetier.created_at)
+    row = (await db.execute(stmt)).one()
+    await db.commit()
+
+    return FavouriteResponse(
+        romeCode=row.rome_code,
+        romeLibelle=row.rome_libelle or row.rome_code,
+        addedAt=row.created_at,
+    )
 
 
 @router.delete("/favourites/{rome_code}", summary="Remove occupation from favourites")
@@ -174,31 +303,37 @@ def remove_favourite(
     db: Session = Depends(get_db_session),
     current_user: User = Depends(get_current_user),
 ) -> None:
-    row = (
-        db.query(FavouriteMetier)
-        .filter(
+    # One DELETE; its rowcount tells whether the favourite existed
+    result = db.execute(
+        delete(FavouriteMetier).where(
             FavouriteMetier.user_id == current_user.id,
             FavouriteMetier.rome_code == rome_code,
         )
-        .first()
     )
-    if not row:
+    if result.rowcount == 0:
         raise HTTPException(status_code=404, detail="Favourite not found")
-    db.delete(row)
     db.commit()
     return None
 
 
-@router.get("/{rome_code}", summary="Get fiche metier from database")
-def get_fiche_metier(
+@router.get("/{rome_code}", summary="Get fiche metier from database", response_model=None)
+async def get_fiche_metier(
     rome_code: str,
-    db: Session = Depends(get_db_session),
-) -> Dict[str, Any]:
-    metier = db.query(Metier_ROME).filter(Metier_ROME.code == rome_code).first()
-    if not metier:
-        raise HTTPException(status_code=404, detail="Metier not found")
-
-    return {
-        "romeCode": metier.code,
-        "romeLibelle": metier.libelle
-    }
+    db: AsyncSession = Depends(get_async_db_session),
+) -> Response:
+    # Answered from the referential already held for GET /metiers, no query per code
+    libelles = (await _cached_metiers_list(db)).libelles
+    if rome_code in libelles:
+        libelle = libelles[rome_code]
+    else:
+        # The list may predate a reload done by another worker, check the table before a 404
+        metier = await db.get(Metier_ROME, rome_code)
+        if not metier:
+            raise HTTPException(status_code=404, detail="Metier not found")
+        libelle = metier.libelle
+
+    body = orjson.dumps({
+        "romeCode": rome_code,
+        "romeLibelle": libelle
+    })
+    return Response(content=body, media_type="application/json")
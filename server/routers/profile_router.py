@@ -3,6 +3,7 @@
 Provides endpoints for user profile setup, CV upload, and experience/education management.
 """
 
+import asyncio
 import logging
 from typing import Dict, Any
 from fastapi import APIRouter, UploadFile, File, Depends, HTTPException, Request, BackgroundTasks
@@ -66,38 +67,49 @@ async def upload_endpoint(
 
     db.commit()
 
-    # Trigger CV evaluation in the background
+    # Trigger CV evaluation and optimal offers generation in the background
     if result.get("extracted_text"):
         from server.routers.cv_router import run_cv_evaluation
         from server.database import SessionLocal
         from server.scheduler import generate_optimal_offers_for_user
 
-        background_tasks.add_task(
-            run_cv_evaluation,
-            user_id=current_user.id,
-            cv_text=result["extracted_text"],
-            cv_filename=result["filename"],
-            db_session_factory=SessionLocal,
-        )
-        result["evaluation_status"] = "started"
-        logger.info(f"CV evaluation triggered for user {current_user.id}")
+        user_id = current_user.id
 
-        # Trigger optimal offers generation after CV upload
-        # Create a new database session for the background task
-        def generate_offers_task():
+        async def generate_offers_task():
             """Background task to generate optimal offers after CV upload."""
-            import asyncio
+            # Awaited on the request's event loop: the France Travail client, its token lock
+            # and semaphore are bound to it and cannot be used from asyncio.run in a thread.
+            # The session is sync, so its queries (and close) are run in worker threads
             db_session = SessionLocal()
             try:
-                asyncio.run(generate_optimal_offers_for_user(current_user.id, db_session, force_refresh=True))
-                logger.info(f"Optimal offers generation triggered for user {current_user.id}")
+                await generate_optimal_offers_for_user(user_id, db_session, force_refresh=True)
+                logger.info(f"Optimal offers generation triggered for user {user_id}")
             except Exception as e:
-                logger.error(f"Error generating optimal offers for user {current_user.id}: {str(e)}")
+                logger.error(f"Error generating optimal offers for user {user_id}: {str(e)}")
             finally:
-                db_session.close()
-
-        background_tasks.add_task(generate_offers_task)
+                await asyncio.to_thread(db_session.close)
+
+        async def post_upload_tasks():
+            """Run both chains side by side: they share no state, and each is a series of LLM round-trips."""
+            results = await asyncio.gather(
+                asyncio.to_thread(
+                    run_cv_evaluation,
+                    user_id=user_id,
+                    cv_text=result["extracted_text"],
+                    cv_filename=result["filename"],
+                    db_session_factory=SessionLocal,
+                ),
+                generate_offers_task(),
+                return_exceptions=True,
+            )
+            for outcome in results:
+                if isinstance(outcome, Exception):
+                    logger.error(f"Post-upload task failed for user {user_id}: {outcome}")
+
+        background_tasks.add_task(post_upload_tasks)
+        result["evaluation_status"] = "started"
         result["optimal_offers_status"] = "started"
+        logger.info(f"CV evaluation triggered for user {user_id}")
 
     return result
 
@@ -122,16 +134,25 @@ async def get_cv_file(
     if upload_root not in file_path.parents:
         raise HTTPException(status_code=400, detail="Invalid CV path")
 
-    if not file_path.exists():
+    # One stat, handed to FileResponse so it does not stat the file again before sending
+    try:
+        stat_result = file_path.stat()
+    except FileNotFoundError:
         raise HTTPException(status_code=404, detail="CV file not found")
 
     media_type, _ = mimetypes.guess_type(current_user.cv_filename)
-    headers = {"Content-Disposition": f'inline; filename="{current_user.cv_filename}"'}
+    headers = {
+        "Content-Disposition": f'inline; filename="{current_user.cv_filename}"',
+        # Repeat views in a session skip the download; short enough for a new upload to show
+        # up quickly, and private keeps shared caches out of it
+        "Cache-Control": "private, max-age=60",
+    }
 
     return FileResponse(
         path=file_path,
         media_type=media_type or "application/octet-stream",
-        headers=headers
+        headers=headers,
+        stat_result=stat_result
     )
 
 
@@ -5,6 +5,7 @@ Provides periodic tasks for automatically generating optimal job offers
 for all users with CVs, ensuring fresh recommendations are always available.
 """
 
+import asyncio
 import logging
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from apscheduler.triggers.interval import IntervalTrigger
@@ -12,6 +13,7 @@ from datetime import datetime, timedelta
 from typing import Optional
 from sqlalchemy.orm import Session
 
+from server.config import settings
 from server.database import SessionLocal
 from server.models import User
 from server.methods.chat import get_optimal_offers_with_cache, identify_ft_parameters
@@ -23,6 +25,20 @@ logger = logging.getLogger(__name__)
 scheduler: Optional[AsyncIOScheduler] = None
 
 
+def _load_user_detached(db: Session, user_id: int) -> Optional[User]:
+    """
+    Load a user and detach it from the session (blocking, run off the event loop).
+
+    The read transaction is ended so the connection goes back to the pool during the
+    France Travail and LLM calls, and is only taken again to save the offers.
+    """
+    user = db.query(User).filter(User.id == user_id).first()
+    if user is not None:
+        db.expunge(user)
+    db.rollback()
+    return user
+
+
 async def generate_optimal_offers_for_user(user_id: int, db: Session, force_refresh: bool = False) -> None:
     """
     Generate optimal job offers for a single user.
@@ -33,14 +49,15 @@ async def generate_optimal_offers_for_user(user_id: int, db: Session, force_refr
         force_refresh: If True, skip cache and regenerate offers
     """
     try:
-        user = db.query(User).filter(User.id == user_id).first()
+        # The session is sync: its queries run in a worker thread, not on the event loop
+        user = await asyncio.to_thread(_load_user_detached, db, user_id)
 
         if not user:
             logger.warning(f"User {user_id} not found, skipping optimal offers generation")
             return
 
         if not user.cv_text or not user.cv_text.strip():
-            logger.debug(f"User {user_id} has no CV, skipping optimal offers generation")
+            logger.debug("User %s has no CV, skipping optimal offers generation", user_id)
             return
 
         logger.info(f"Generating optimal offers for user {user_id} ({user.username})")
@@ -69,7 +86,7 @@ async def generate_optimal_offers_for_user(user_id: int, db: Session, force_refr
 
     except Exception as e:
         logger.error(f"Error generating optimal offers for user {user_id}: {str(e)}")
-        db.rollback()  # Rollback to keep session active for next user
+        await asyncio.to_thread(db.rollback)  # Rollback to keep session active for next user
         # Don't raise - continue processing other users
 
 
@@ -82,25 +99,43 @@ async def generate_optimal_offers_for_all_users() -> None:
     """
     logger.info("Starting periodic optimal offers generation for all users")
 
-    db = SessionLocal()
     try:
-        # Get all users who have a CV
-        users_with_cv = db.query(User).filter(
-            User.cv_text.isnot(None),
-            User.cv_text != ""
-        ).all()
-
-        logger.info(f"Found {len(users_with_cv)} users with CVs")
-
-        for user in users_with_cv:
-            await generate_optimal_offers_for_user(user.id, db)
+        # Get all users who have a CV: only their ids, generate_optimal_offers_for_user loads
+        # each user (and its cv_text) when its turn comes. The listing session is released
+        # right away instead of pinning a pooled connection for the whole run
+        with SessionLocal() as db:
+            user_ids = [
+                user_id for (user_id,) in db.query(User.id).filter(
+                    User.cv_text.isnot(None),
+                    User.cv_text != ""
+                )
+            ]
+
+        logger.info(f"Found {len(user_ids)} users with CVs")
+
+        # The work is mostly waiting on France Travail and the LLM, so users are processed
+        # concurrently; the semaphore bounds the load put on those services
+        semaphore = asyncio.Semaphore(settings.scheduler_max_concurrent_users)
+
+        async def generate_for(user_id: int) -> None:
+            async with semaphore:
+                # Sessions are not safe for concurrent use, each user gets its own
+                with SessionLocal() as user_db:
+                    await generate_optimal_offers_for_user(user_id, user_db)
+
+        results = await asyncio.gather(
+            *(generate_for(user_id) for user_id in user_ids),
+            return_exceptions=True
+        )
+        # generate_optimal_offers_for_user logs its own errors; these escaped it (session setup/close, cancellation)
+        for user_id, outcome in zip(user_ids, results):
+            if isinstance(outcome, BaseException):
+                logger.error(f"Optimal offers generation failed for user {user_id}: {outcome!r}")
 
         logger.info("Completed periodic optimal offers generation for all users")
 
     except Exception as e:
         logger.error(f"Error in periodic optimal offers generation: {str(e)}")
-    finally:
-        db.close()
 
 
 async def recover_stale_evaluations_task() -> None:
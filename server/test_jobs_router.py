@@ -0,0 +1,92 @@
+"""
+Tests for the salary parsing used by the fiche metier endpoint.
+"""
+
+import sys
+from pathlib import Path
+# Add parent directory to path to allow imports - MUST be first
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import pytest
+from server.routers.jobs_router import calcul_salaire
+
+
+class TestCalculSalaire:
+    """Tests for calcul_salaire (monthly salary from France Travail libellés)."""
+
+    @pytest.mark.parametrize("texte_salaire, expected", [
+        ("Mensuel de 2000.0 Euros", 2000.0),
+        ("Mensuel de 2000.0 Euros à 2400.0 Euros", 2200.0),
+        ("Mensuel de 2000.0 Euros sur 13.0 mois", 2000.0 * 13 / 12),
+        ("Mensuel de 2000.0 Euros à 2400.0 Euros sur 13.0 mois", 2200.0 * 13 / 12),
+        ("Mensuel de 1800,50 Euros", 1800.5),
+        ("mensuel de 2000 euros", 2000.0),
+    ])
+    def test_mensuel(self, texte_salaire, expected):
+        """Monthly amounts: single, range average and month count."""
+        assert calcul_salaire(texte_salaire, None) == pytest.approx(expected)
+
+    @pytest.mark.parametrize("texte_salaire, expected", [
+        ("Annuel de 36000.0 Euros", 3000.0),
+        ("Annuel de 30000.0 Euros à 42000.0 Euros", 3000.0),
+        ("Annuel de 36000.0 Euros sur 13.0 mois", 36000.0 * 13 / 12 / 12),
+        ("Annuel de 30000.0 Euros à 42000.0 Euros sur 13.0 mois", 36000.0 * 13 / 12 / 12),
+    ])
+    def test_annuel(self, texte_salaire, expected):
+        """Yearly amounts are brought back to a month."""
+        assert calcul_salaire(texte_salaire, None) == pytest.approx(expected)
+
+    @pytest.mark.parametrize("texte_salaire, expected", [
+        ("Horaire de 12.0 Euros", 12.0 * 35 * 52 / 12),
+        ("Horaire de 11.0 Euros à 13.0 Euros", 12.0 * 35 * 52 / 12),
+        ("Horaire de 12.0 Euros sur 13.0 mois", 12.0 * 35 * 52 / 12 * 13 / 12),
+        ("Horaire de 11.0 Euros à 13.0 Euros sur 13.0 mois", 12.0 * 35 * 52 / 12 * 13 / 12),
+    ])
+    def test_horaire(self, texte_salaire, expected):
+        """Hourly amounts default to a 35 hour week."""
+        assert calcul_salaire(texte_salaire, None) == pytest.approx(expected)
+
+    @pytest.mark.parametrize("texte_heure, heures", [
+        (None, 35.0),
+        ("", 35.0),
+        ("35H/semaine", 35.0),
+        ("39H/semaine Travail en journée", 39.0),
+        ("Temps partiel - 24H/semaine", 24.0),
+        ("35H30/semaine", 35.5),
+        ("17,5H/semaine", 17.5),
+        ("Travail en horaires décalés", 35.0),
+        ("semaine de 4 jours - 32H/semaine", 35.0),
+    ])
+    def test_hours_formats(self, texte_heure, heures):
+        """Weekly hours scale hourly salaries, anything unrecognised means 35 hours."""
+        expected = 12.0 * heures * 52 / 12
+        assert calcul_salaire("Horaire de 12.0 Euros", texte_heure) == pytest.approx(expected)
+
+    @pytest.mark.parametrize("texte_salaire", ["Mensuel de 2000.0 Euros", "Annuel de 24000.0 Euros"])
+    def test_hours_ignored_for_monthly_and_yearly(self, texte_salaire):
+        """Only hourly salaries depend on the working time."""
+        assert calcul_salaire(texte_salaire, "Temps partiel - 24H/semaine") == pytest.approx(2000.0)
+
+    @pytest.mark.parametrize("texte_salaire", [
+        None,
+        "",
+        "   ",
+        "Cachet de 200.0 Euros",
+        "Selon profil",
+        "Mensuel",
+        "Mensuel selon expérience",
+        "Horaire de Euros",
+    ])
+    def test_unknown_or_unmatched(self, texte_salaire):
+        """Unknown prefixes and libellés without an amount are not parsed."""
+        assert calcul_salaire(texte_salaire, None) is None
+
+    @pytest.mark.parametrize("texte_salaire, texte_heure", [
+        ("Mensuel de 1.200,50 Euros", None),
+        ("Annuel de 30000.0 Euros à 1.2.3 Euros", None),
+        ("Mensuel de 2000.0 Euros sur 1.2.3 mois", None),
+        ("Horaire de 12.0 Euros", "1.2.3H/semaine"),
+    ])
+    def test_malformed_numbers(self, texte_salaire, texte_heure):
+        """Malformed numbers return None instead of raising."""
+        assert calcul_salaire(texte_salaire, texte_heure) is None
@@ -0,0 +1,101 @@
+"""
+Tests for the content negotiation and caching helpers of the metiers endpoints.
+"""
+
+import sys
+from pathlib import Path
+# Add parent directory to path to allow imports - MUST be first
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import pytest
+from starlette.requests import Request
+from server.routers.metiers_router import _accepts_gzip, _etag, _json_response
+
+
+def make_request(headers=None):
+    """Build a bare GET request carrying the given headers."""
+    return Request({
+        "type": "http",
+        "method": "GET",
+        "path": "/metiers",
+        "headers": [(name.lower().encode(), value.encode()) for name, value in (headers or {}).items()],
+    })
+
+
+class TestAcceptsGzip:
+    """Tests for Accept-Encoding parsing."""
+
+    @pytest.mark.parametrize("accept_encoding", [
+        "gzip",
+        "GZIP",
+        "gzip, deflate, br",
+        "br;q=1.0, gzip;q=0.8",
+        "gzip;q=0.001",
+        "*",
+        "deflate, *;q=0.5",
+    ])
+    def test_accepted(self, accept_encoding):
+        """gzip is allowed explicitly or through the wildcard."""
+        assert _accepts_gzip(accept_encoding) is True
+
+    @pytest.mark.parametrize("accept_encoding", [
+        "",
+        "identity",
+        "deflate, br",
+        "gzip;q=0",
+        "gzip; q=0.0",
+        "gzip;q=abc",
+        "*;q=0",
+    ])
+    def test_refused(self, accept_encoding):
+        """A missing, zero-weighted or unparsable gzip entry is a refusal."""
+        assert _accepts_gzip(accept_encoding) is False
+
+    def test_explicit_gzip_refusal_overrides_wildcard(self):
+        """gzip;q=0 wins over an accepting wildcard, whatever the order."""
+        assert _accepts_gzip("*, gzip;q=0") is False
+        assert _accepts_gzip("gzip;q=0, *") is False
+
+    def test_explicit_gzip_overrides_refusing_wildcard(self):
+        """An explicit gzip entry wins over *;q=0."""
+        assert _accepts_gzip("*;q=0, gzip") is True
+        assert _accepts_gzip("gzip;q=0.5, *;q=0") is True
+
+
+class TestJsonResponse:
+    """Tests for ETag validation of cached JSON bodies."""
+
+    body = b'[{"romeCode":"A1413","romeLibelle":"Aide agricole"}]'
+
+    def test_full_response_without_validator(self):
+        """Without If-None-Match the body is sent with its ETag."""
+        etag = _etag(self.body)
+        response = _json_response(make_request(), etag, self.body)
+        assert response.status_code == 200
+        assert response.body == self.body
+        assert response.headers["etag"] == etag
+        assert response.headers["cache-control"] == "no-cache"
+        assert response.media_type == "application/json"
+
+    def test_not_modified_on_matching_etag(self):
+        """A matching If-None-Match gets an empty 304 that keeps the validator and extra headers."""
+        etag = _etag(self.body)
+        response = _json_response(
+            make_request({"If-None-Match": etag}), etag, self.body, {"Vary": "Accept-Encoding"}
+        )
+        assert response.status_code == 304
+        assert response.body == b""
+        assert response.headers["etag"] == etag
+        assert response.headers["vary"] == "Accept-Encoding"
+
+    def test_full_response_on_stale_etag(self):
+        """An outdated If-None-Match gets the current body."""
+        etag = _etag(self.body)
+        response = _json_response(make_request({"If-None-Match": _etag(b"[]")}), etag, self.body)
+        assert response.status_code == 200
+        assert response.body == self.body
+
+    def test_etag_depends_on_body(self):
+        """Different bodies never share a validator."""
+        assert _etag(self.body) == _etag(self.body)
+        assert _etag(self.body) != _etag(b"[]")
@@ -0,0 +1,57 @@
+"""
+Tests for the blocking-call helpers of the thread pool module.
+"""
+
+import sys
+from pathlib import Path
+# Add parent directory to path to allow imports - MUST be first
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import asyncio
+import threading
+
+import pytest
+from server.thread_pool import run_blocking_in_executor, run_in_thread_pool
+
+
+def current_thread_name() -> str:
+    return threading.current_thread().name
+
+
+class TestRunInThreadPool:
+    """Tests for run_in_thread_pool."""
+
+    def test_off_loop_call_runs_on_blocking_pool(self):
+        """Without a running loop the call is submitted to the blocking I/O pool."""
+        assert run_in_thread_pool(current_thread_name).startswith("blocking_io_")
+
+    def test_arguments_and_exceptions_are_passed_through(self):
+        """Positional and keyword arguments reach func, and its exceptions reach the caller."""
+        assert run_in_thread_pool(int, "ff", base=16) == 255
+        with pytest.raises(ValueError):
+            run_in_thread_pool(int, "not a number")
+
+    def test_nested_call_runs_in_place(self):
+        """A call made from a blocking pool worker does not wait on a sibling worker."""
+        outer, inner = run_in_thread_pool(
+            lambda: (current_thread_name(), run_in_thread_pool(current_thread_name))
+        )
+        assert outer == inner
+
+    def test_nested_call_from_async_helper_runs_in_place(self):
+        """Code already running through run_blocking_in_executor can call the sync helper."""
+        async def main():
+            return await run_blocking_in_executor(
+                lambda: (current_thread_name(), run_in_thread_pool(current_thread_name))
+            )
+
+        outer, inner = asyncio.run(main())
+        assert outer == inner
+
+    def test_event_loop_thread_is_refused(self):
+        """Blocking the event loop thread is refused instead of stalling every client."""
+        async def main():
+            run_in_thread_pool(current_thread_name)
+
+        with pytest.raises(RuntimeError):
+            asyncio.run(main())
@@ -0,0 +1,56 @@
+"""
+Tests for the extracted-text cache of CV uploads.
+"""
+
+import sys
+from io import BytesIO
+from pathlib import Path
+# Add parent directory to path to allow imports - MUST be first
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import pytest
+from server.methods import upload
+
+
+@pytest.fixture
+def extractions(monkeypatch):
+    """Stub text extraction with a queue of results and record each call."""
+    results = []
+    calls = []
+
+    def fake_extract(file_path, file_extension):
+        calls.append(file_path)
+        return results.pop(0)
+
+    monkeypatch.setattr(upload, "extract_text_from_file", fake_extract)
+    upload._extracted_text_cache.clear()
+    yield results, calls
+    upload._extracted_text_cache.clear()
+
+
+class TestSaveAndExtract:
+    """Tests for _save_and_extract."""
+
+    def test_identical_upload_reuses_extracted_text(self, tmp_path, extractions):
+        """A file already parsed is served from the cache."""
+        results, calls = extractions
+        results.append("Jane Doe, data engineer")
+
+        first = upload._save_and_extract(BytesIO(b"%PDF cv"), tmp_path / "a.pdf", ".pdf")
+        second = upload._save_and_extract(BytesIO(b"%PDF cv"), tmp_path / "b.pdf", ".pdf")
+
+        assert first == second == "Jane Doe, data engineer"
+        assert len(calls) == 1
+        assert (tmp_path / "b.pdf").read_bytes() == b"%PDF cv"
+
+    def test_empty_extraction_is_not_cached(self, tmp_path, extractions):
+        """An empty result is retried on the next upload of the same file."""
+        results, calls = extractions
+        results.extend(["  \n", "Jane Doe, data engineer"])
+
+        first = upload._save_and_extract(BytesIO(b"%PDF cv"), tmp_path / "a.pdf", ".pdf")
+        second = upload._save_and_extract(BytesIO(b"%PDF cv"), tmp_path / "b.pdf", ".pdf")
+
+        assert first == "  \n"
+        assert second == "Jane Doe, data engineer"
+        assert len(calls) == 2
@@ -7,25 +7,58 @@ accessing the application.
 """
 
 import asyncio
+import contextvars
+import functools
 import logging
+import threading
 from concurrent.futures import ThreadPoolExecutor
-from typing import Callable, TypeVar, Any
+from typing import Callable, Optional, TypeVar, Any
+
+from anyio import to_thread
+
+from server.config import settings
 
 logger = logging.getLogger(__name__)
 
 # Thread pool for blocking I/O operations
 # Using max_workers to prevent resource exhaustion
-_blocking_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="blocking_io_")
+_BLOCKING_THREAD_PREFIX = "blocking_io_"
+_blocking_executor = ThreadPoolExecutor(max_workers=settings.blocking_io_pool_size, thread_name_prefix=_BLOCKING_THREAD_PREFIX)
+
+# Default executor of the event loop, used by asyncio.to_thread (set in configure_thread_pools)
+_default_executor: Optional[ThreadPoolExecutor] = None
 
 T = TypeVar('T')
 
 
+def configure_thread_pools(size: Optional[int] = None) -> None:
+    """
+    Size the thread pools used to run blocking code from the event loop.
+
+    Sets the AnyIO limiter used by FastAPI for sync endpoints and dependencies, and
+    installs a default executor of the same size so that asyncio.to_thread does not
+    fall back to its small CPU-based default. Must be called from the running loop.
+
+    Args:
+        size: Number of worker threads (default: settings.thread_pool_size)
+    """
+    global _default_executor
+
+    size = size or settings.thread_pool_size
+    to_thread.current_default_thread_limiter().total_tokens = size
+
+    _default_executor = ThreadPoolExecutor(max_workers=size, thread_name_prefix="dux_")
+    asyncio.get_running_loop().set_default_executor(_default_executor)
+    logger.info(f"Thread pools configured with {size} workers")
+
+
 def run_in_thread_pool(func: Callable[..., T], *args, **kwargs) -> T:
     """
     Run a blocking function in a thread pool and wait for result.
 
-    This is a synchronous wrapper that blocks the calling thread but doesn't
-    block the event loop. Use this in sync functions that need to call blocking I/O.
+    This is a synchronous wrapper that blocks the calling thread. Use this in sync
+    functions running off the event loop; async code must await run_blocking_in_executor.
+    On the pool's own workers func runs in place, so nested calls cannot exhaust the pool.
 
     Args:
         func: Blocking function to execute
@@ -36,23 +69,23 @@ def run_in_thread_pool(func: Callable[..., T], *args, **kwargs) -> T:
         Result from func
 
     Raises:
+        RuntimeError: If called from a thread running an event loop
         Exception: Any exception raised by func
     """
+    if asyncio._get_running_loop() is not None:
+        # Waiting here would stall every client served by this loop
+        raise RuntimeError("run_in_thread_pool cannot wait on the event loop thread, await run_blocking_in_executor instead")
+
+    if threading.current_thread().name.startswith(_BLOCKING_THREAD_PREFIX):
+        # Waiting on a sibling worker could deadlock once every worker does the same
+        return func(*args, **kwargs)
+
     try:
-        loop = asyncio.get_event_loop()
-        # If we're in the main thread, use run_coroutine_threadsafe
-        if loop.is_running():
-            future = asyncio.run_coroutine_threadsafe(
-                asyncio.to_thread(func, *args, **kwargs),
-                loop
-            )
-            return future.result()
-        else:
-            # If loop is not running, we're in a thread, just call directly
-            return func(*args, **kwargs)
+        future = _blocking_executor.submit(func, *args, **kwargs)
     except RuntimeError:
-        # No event loop in this thread, call directly
+        # Executor already shut down, call directly
         return func(*args, **kwargs)
+    return future.result()
 
 
 async def run_blocking_in_executor(func: Callable[..., T], *args, **kwargs) -> T:
@@ -73,14 +106,12 @@ async def run_blocking_in_executor(func: Callable[..., T], *args, **kwargs) -> T
     Raises:
         Exception: Any exception raised by func
     """
-    loop = asyncio.get_event_loop()
+    loop = asyncio.get_running_loop()
+    # Like asyncio.to_thread, run func in a copy of the caller's context
+    call = functools.partial(contextvars.copy_context().run, func, *args, **kwargs)
     try:
-        # Use to_thread for Python 3.9+
-        if hasattr(asyncio, 'to_thread'):
-            return await asyncio.to_thread(func, *args, **kwargs)
-        else:
-            # Fallback for Python 3.8
-            return await loop.run_in_executor(_blocking_executor, func, *args, **kwargs)
+        # The dedicated pool bounds these calls, the default executor stays free for the rest
+        return await loop.run_in_executor(_blocking_executor, call)
     except Exception as e:
         logger.error(f"Error running blocking function in executor: {str(e)}", exc_info=True)
         raise
@@ -88,8 +119,9 @@ async def run_blocking_in_executor(func: Callable[..., T], *args, **kwargs) -> T
 
 def shutdown_thread_pool():
     """Shutdown the thread pool executor gracefully."""
+    # The loop's default executor is shut down by asyncio itself when the loop closes
     try:
-        _blocking_executor.shutdown(wait=True, timeout=10)
+        _blocking_executor.shutdown(wait=True)
         logger.info("Thread pool executor shutdown complete")
     except Exception as e:
         logger.error(f"Error shutting down thread pool: {str(e)}")
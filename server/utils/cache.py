@@ -0,0 +1,69 @@
+"""
+In-process caching helpers.
+
+Provides a small TTL cache with LRU eviction for results that are expensive to
+compute (LLM calls) and stay valid until their inputs change.
+"""
+
+import hashlib
+import time
+from collections import OrderedDict
+from typing import Any, Hashable, Optional, Tuple
+
+
+def digest_key(*parts: Any) -> str:
+    """
+    Return a short hex digest of `parts`, for keying caches on large inputs (prompts, CV text).
+
+    Strings are hashed as-is rather than through repr(), which would copy and escape them.
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    for part in parts:
+        if isinstance(part, str):
+            digest.update(part.encode())
+            digest.update(b"\0")
+        else:
+            digest.update(repr(part).encode())
+            digest.update(b"\1")
+    return digest.hexdigest()
+
+
+class TTLCache:
+    """
+    Bounded in-memory cache whose entries expire after a fixed time-to-live.
+
+    Entries are evicted least-recently-used first once `maxsize` is reached.
+    Intended to be used from the event loop only; it is not thread-safe.
+    """
+
+    def __init__(self, ttl: float, maxsize: int = 1024):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self._entries: "OrderedDict[Hashable, Tuple[Any, float]]" = OrderedDict()
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Return the cached value for `key`, or None if missing or expired."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        value, expires_at = entry
+        if time.monotonic() >= expires_at:
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        """Store `value` under `key` for `ttl` seconds."""
+        self._entries[key] = (value, time.monotonic() + self.ttl)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def pop(self, key: Hashable) -> None:
+        """Remove `key` from the cache if present."""
+        self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        """Remove every entry."""
+        self._entries.clear()
@@ -5,21 +5,29 @@ Provides a consistent way to make LLM calls across the application,
 handling client initialization, error handling, JSON parsing, and response extraction.
 """
 
-import json
+import copy
 import logging
 import base64
+import threading
 from io import BytesIO
 from typing import AsyncIterator, Optional, Dict, Any, List, Union, TYPE_CHECKING
+import orjson
 from openai import APIError, OpenAI
 
 from server.config import settings
-from server.utils.openai_client import create_openai_client, create_async_openai_client
+from server.utils.cache import TTLCache, digest_key
+from server.utils.openai_client import get_async_openai_client, get_openai_client
 
 if TYPE_CHECKING:
     from PIL import Image
 
 logger = logging.getLogger(__name__)
 
+# Exact-match response cache for the templated calls that opt in (same CV re-evaluated, ...).
+# call_llm_sync runs on worker threads, hence the lock around the event-loop-only TTLCache.
+_response_cache = TTLCache(ttl=settings.llm_cache_ttl_seconds, maxsize=512)
+_response_cache_lock = threading.Lock()
+
 
 # ============================================================================
 # Response Extraction and Parsing Utilities
@@ -84,6 +92,8 @@ def parse_json_response(content: str, json_array: bool = False) -> Union[Dict[st
         ValueError: If JSON parsing fails
     """
     try:
+        # find/rfind locate the outermost brackets in one scan each (this also drops code
+        # fences and any prose around the JSON); orjson parses several times faster than json
         if json_array:
             json_start = content.find('[')
             json_end = content.rfind(']') + 1
@@ -93,10 +103,10 @@ def parse_json_response(content: str, json_array: bool = False) -> Union[Dict[st
 
         if json_start >= 0 and json_end > json_start:
             json_str = content[json_start:json_end]
-            return json.loads(json_str)
+            return orjson.loads(json_str)
         else:
-            return json.loads(content)
-    except json.JSONDecodeError as e:
+            return orjson.loads(content)
+    except orjson.JSONDecodeError as e:
         # Redact content to avoid PII leakage in logs
         content_preview = content[:200] + "…" if len(content) > 200 else content
         logger.error(
@@ -161,6 +171,23 @@ def image_to_base64(image: "Image.Image") -> str:
     return f"data:image/png;base64,{img_str}"
 
 
+# ============================================================================
+# Response Cache
+# ============================================================================
+
+
+def _cached_response(key: str) -> Optional[Dict[str, Any]]:
+    with _response_cache_lock:
+        cached = _response_cache.get(key)
+    # Callers are free to mutate the parsed data, never hand out the stored object
+    return copy.deepcopy(cached) if cached is not None else None
+
+
+def _store_response(key: str, result: Dict[str, Any]) -> None:
+    with _response_cache_lock:
+        _response_cache.set(key, copy.deepcopy(result))
+
+
 # ============================================================================
 # Core LLM Call Functions
 # ============================================================================
@@ -176,6 +203,7 @@ def call_llm_sync(
     model: Optional[str] = None,
     response_format: Optional[Dict[str, str]] = None,
     vlm_request: Optional[Dict[str, Any]] = None,
+    cache: bool = False,
 ) -> Dict[str, Any]:
     """
     Synchronous LLM call (blocking operation for thread pool).
@@ -195,6 +223,8 @@ def call_llm_sync(
         vlm_request: Optional VLM request dict with keys:
             - images: List of PIL Image objects
             - use_vlm_client: Whether to use VLM client (default: True)
+        cache: Reuse the response of an identical earlier text-only call for
+            settings.llm_cache_ttl_seconds (default: False)
 
     Returns:
         dict: Response data with keys:
@@ -205,6 +235,8 @@ def call_llm_sync(
     Raises:
         ValueError: If LLM call fails or response is invalid
     """
+    cache_key = None
+
     # Handle VLM requests
     if vlm_request and vlm_request.get("images"):
         use_vlm_client = vlm_request.get("use_vlm_client", True)
@@ -216,7 +248,7 @@ def call_llm_sync(
             client = create_vlm_client()
         else:
             model = model or settings.openai_model
-            client = create_openai_client()
+            client = get_openai_client()
         
         # Prepare image content for API
         image_contents = [
@@ -237,7 +269,17 @@ def call_llm_sync(
     else:
         # Standard text-only LLM request
         model = model or settings.openai_model
-        client = create_openai_client()
+
+        if cache:
+            # Digest of everything that determines the answer (model, prompts, sampling options)
+            cache_key = digest_key(
+                model, system_content, prompt, temperature, max_tokens, parse_json, json_array, response_format
+            )
+            cached = _cached_response(cache_key)
+            if cached is not None:
+                return cached
+
+        client = get_openai_client()
         
         messages = [
             {"role": "system", "content": system_content},
@@ -266,11 +308,14 @@ def call_llm_sync(
         else:
             data = content
 
-        return {
+        result = {
             "data": data,
             "usage": build_usage_dict(response),
             "model": response.model,
         }
+        if cache_key is not None:
+            _store_response(cache_key, result)
+        return result
 
     except ValueError:
         raise
@@ -289,6 +334,7 @@ async def call_llm_async(
     model: Optional[str] = None,
     response_format: Optional[Dict[str, str]] = None,
     vlm_request: Optional[Dict[str, Any]] = None,
+    cache: bool = False,
 ) -> Dict[str, Any]:
     """
     Asynchronous LLM call (runs sync function in thread pool).
@@ -308,6 +354,8 @@ async def call_llm_async(
         vlm_request: Optional VLM request dict with keys:
             - images: List of PIL Image objects
             - use_vlm_client: Whether to use VLM client (default: True)
+        cache: Reuse the response of an identical earlier text-only call for
+            settings.llm_cache_ttl_seconds (default: False)
 
     Returns:
         dict: Response data with keys:
@@ -331,6 +379,7 @@ async def call_llm_async(
         model,
         response_format,
         vlm_request,
+        cache,
     )
 
 
@@ -345,7 +394,7 @@ def call_llm_messages_sync(
     Each message must have "role" ("system" | "user" | "assistant") and "content" (str).
     """
     model = model or settings.openai_model
-    client = create_openai_client()
+    client = get_openai_client()
     try:
         response = client.chat.completions.create(
             model=model,
@@ -394,7 +443,7 @@ async def stream_llm_messages_async(
     Yields str chunks; use for SSE or other streaming responses.
     """
     model = model or settings.openai_model
-    client = create_async_openai_client()
+    client = get_async_openai_client()
     try:
         stream = await client.chat.completions.create(
             model=model,
@@ -414,5 +463,3 @@ async def stream_llm_messages_async(
     except Exception as e:
         logger.exception("LLM stream failed")
         raise
-    finally:
-        await client.close()
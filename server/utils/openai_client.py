@@ -5,10 +5,23 @@ Provides a single source for creating OpenAI clients with consistent
 configuration across the application.
 """
 
-from openai import AsyncOpenAI, OpenAI
+import threading
+from typing import Optional
+
+import httpx
+from openai import AsyncOpenAI, DefaultAsyncHttpxClient, DefaultHttpxClient, OpenAI
 from httpx import Timeout
 from server.config import settings
 
+# Process-wide clients: each OpenAI client owns a connection pool, so reusing one keeps
+# TCP/TLS connections alive across LLM calls instead of handshaking on every call.
+_client: Optional[OpenAI] = None
+_async_client: Optional[AsyncOpenAI] = None
+_client_lock = threading.Lock()
+
+# Sized for concurrent pipeline / scheduler calls coming from the worker threads
+_POOL_LIMITS = httpx.Limits(max_connections=100, max_keepalive_connections=20)
+
 
 def _client_kwargs() -> dict:
     """Shared kwargs for sync and async clients."""
@@ -44,3 +57,46 @@ def create_openai_client() -> OpenAI:
 def create_async_openai_client() -> AsyncOpenAI:
     """Create an async OpenAI client (e.g. for streaming)."""
     return AsyncOpenAI(**_client_kwargs())
+
+
+def get_openai_client() -> OpenAI:
+    """
+    Return the shared sync OpenAI client, creating it on first use.
+
+    The client is thread-safe and speaks HTTP/2 where the endpoint supports it.
+    Rate limits, timeouts and 5xx responses are retried by the SDK itself.
+    """
+    global _client
+
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = OpenAI(
+                    **_client_kwargs(),
+                    http_client=DefaultHttpxClient(http2=True, limits=_POOL_LIMITS),
+                )
+    return _client
+
+
+def get_async_openai_client() -> AsyncOpenAI:
+    """Return the shared async OpenAI client (used on the main event loop for streaming)."""
+    global _async_client
+
+    if _async_client is None:
+        _async_client = AsyncOpenAI(
+            **_client_kwargs(),
+            http_client=DefaultAsyncHttpxClient(http2=True, limits=_POOL_LIMITS),
+        )
+    return _async_client
+
+
+async def close_openai_clients() -> None:
+    """Close the shared clients. Should be called during application shutdown."""
+    global _client, _async_client
+
+    if _client is not None:
+        _client.close()
+        _client = None
+    if _async_client is not None:
+        await _async_client.close()
+        _async_client = None
@@ -1,9 +1,12 @@
 """
 Shared utility for loading prompt templates.
 """
+from functools import lru_cache
 from pathlib import Path
 
 
+# Templates ship with the code: read each file once instead of on every request that builds a prompt
+@lru_cache(maxsize=None)
 def load_prompt_template(template_name: str) -> str:
     """
     Load a prompt template from the prompts directory.
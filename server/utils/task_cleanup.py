@@ -7,6 +7,7 @@ and recovery of stale pending evaluations.
 
 import logging
 from datetime import datetime, timedelta, timezone
+from sqlalchemy import update
 from sqlalchemy.orm import Session
 from server.models import CVEvaluation
 
@@ -26,24 +27,23 @@ def cleanup_pending_tasks(db: Session) -> int:
         Number of tasks marked as failed
     """
     try:
-        # Find all pending evaluations
-        pending_evaluations = db.query(CVEvaluation).filter(
-            CVEvaluation.evaluation_status == "pending"
-        ).all()
-
-        failed_count = 0
-        for evaluation in pending_evaluations:
-            try:
-                evaluation.evaluation_status = "failed"
-                evaluation.error_message = "Application shutdown while processing. Please try again."
-                db.add(evaluation)
-                failed_count += 1
-                logger.warning(f"Marked pending evaluation {evaluation.id} as failed due to shutdown")
-            except Exception as e:
-                logger.error(f"Failed to mark evaluation {evaluation.id} as failed: {e}")
+        # One UPDATE for every pending evaluation, without loading the rows (and their JSON) first
+        failed_ids = db.execute(
+            update(CVEvaluation)
+            .where(CVEvaluation.evaluation_status == "pending")
+            .values(
+                evaluation_status="failed",
+                error_message="Application shutdown while processing. Please try again.",
+            )
+            .returning(CVEvaluation.id)
+            .execution_options(synchronize_session=False)
+        ).scalars().all()
+
+        for evaluation_id in failed_ids:
+            logger.warning(f"Marked pending evaluation {evaluation_id} as failed due to shutdown")
 
         db.commit()
-        return failed_count
+        return len(failed_ids)
 
     except Exception as e:
         logger.error(f"Error cleaning up pending tasks: {e}")
@@ -67,28 +67,29 @@ def recover_stale_evaluations(db: Session, stale_after_minutes: int = 30) -> int
     try:
         stale_threshold = datetime.now(timezone.utc) - timedelta(minutes=stale_after_minutes)
 
-        # Find pending evaluations older than threshold
-        stale_evaluations = db.query(CVEvaluation).filter(
-            CVEvaluation.evaluation_status == "pending",
-            CVEvaluation.created_at < stale_threshold
+        # One UPDATE for every stale evaluation, without loading the rows (and their JSON) first
+        recovered = db.execute(
+            update(CVEvaluation)
+            .where(
+                CVEvaluation.evaluation_status == "pending",
+                CVEvaluation.created_at < stale_threshold
+            )
+            .values(
+                evaluation_status="failed",
+                error_message=f"Evaluation timed out after {stale_after_minutes} minutes. Please try again.",
+            )
+            .returning(CVEvaluation.id, CVEvaluation.created_at)
+            .execution_options(synchronize_session=False)
         ).all()
 
-        recovered_count = 0
-        for evaluation in stale_evaluations:
-            try:
-                evaluation.evaluation_status = "failed"
-                evaluation.error_message = f"Evaluation timed out after {stale_after_minutes} minutes. Please try again."
-                db.add(evaluation)
-                recovered_count += 1
-                logger.warning(
-                    f"Recovered stale evaluation {evaluation.id} "
-                    f"(pending since {evaluation.created_at})"
-                )
-            except Exception as e:
-                logger.error(f"Failed to recover evaluation {evaluation.id}: {e}")
+        for evaluation_id, created_at in recovered:
+            logger.warning(
+                f"Recovered stale evaluation {evaluation_id} "
+                f"(pending since {created_at})"
+            )
 
         db.commit()
-        return recovered_count
+        return len(recovered)
 
     except Exception as e:
         logger.error(f"Error recovering stale evaluations: {e}")